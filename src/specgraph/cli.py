@@ -1,14 +1,42 @@
-"""CLI interface for specgraph using Click."""
+"""CLI interface for specgraph using Click.
+
+Workflow modules pull in LangGraph and the Anthropic SDK, so each command
+imports only the workflow it runs (and asyncio, where it needs it). This
+keeps `acpctl --help` fast.
+"""
 
 import os
 import sys
+from typing import NoReturn
 
 import click
 
-from specgraph.workflows.clarify import run_clarify
-from specgraph.workflows.plan import run_plan
-from specgraph.workflows.specify import run_specify
-from specgraph.workflows.tasks import run_tasks
+
+def _fail(message: str) -> NoReturn:
+    """Print an error message and exit."""
+    click.secho(f"❌ Error: {message}", fg="red", err=True)
+    sys.exit(1)
+
+
+def _die(result: dict) -> None:
+    """Exit with the workflow's error message if the workflow failed."""
+    if result.get("error"):
+        _fail(result["error"])
+
+
+def _require_api_key() -> None:
+    """Exit with an error if the Anthropic API key is not configured."""
+    if not os.getenv("ANTHROPIC_API_KEY"):
+        click.secho(
+            "Error: ANTHROPIC_API_KEY environment variable not set", fg="red", err=True
+        )
+        click.echo("Set it with: export ANTHROPIC_API_KEY='your-api-key'", err=True)
+        sys.exit(1)
+
+
+def _echo_chunk(chunk: str) -> None:
+    """Print a chunk of streamed Claude output as it arrives."""
+    click.echo(chunk, nl=False)
 
 
 @click.group()
@@ -18,16 +46,6 @@ def cli():
 
     A minimal implementation of spec-kit's specify and plan phases.
     """
-    # Check for Anthropic API key
-    if not os.getenv("ANTHROPIC_API_KEY"):
-        click.echo(
-            click.style(
-                "Error: ANTHROPIC_API_KEY environment variable not set", fg="red"
-            ),
-            err=True,
-        )
-        click.echo("Set it with: export ANTHROPIC_API_KEY='your-api-key'", err=True)
-        sys.exit(1)
 
 
 @cli.command()
@@ -40,28 +58,35 @@ def specify(feature_description: str):
     Example:
         acpctl specify "Build a photo album organizer with drag-and-drop"
     """
-    click.echo(click.style("🔍 Generating specification...", fg="blue"))
+    _require_api_key()
+
+    from specgraph.workflows.specify import run_specify
+
+    click.secho("🔍 Generating specification...", fg="blue")
 
     try:
-        result = run_specify(feature_description)
+        result = run_specify(feature_description, on_text=_echo_chunk)
+        click.echo()
 
-        if result.get("error"):
-            click.echo(click.style(f"❌ Error: {result['error']}", fg="red"), err=True)
-            sys.exit(1)
+        _die(result)
 
-        click.echo(click.style("✅ Specification generated!", fg="green"))
+        click.secho("✅ Specification generated!", fg="green")
         click.echo(f"\nSpec Number: {result['spec_number']:03d}")
         click.echo(f"Location: {result['spec_path']}/specification.md")
         click.echo("\nNext step: acpctl plan '<technical constraints>'")
 
     except Exception as e:
-        click.echo(click.style(f"❌ Error: {str(e)}", fg="red"), err=True)
-        sys.exit(1)
+        _fail(str(e))
 
 
 @cli.command()
 @click.argument("technical_constraints", required=False, default="")
-def plan(technical_constraints: str):
+@click.option(
+    "--structured",
+    is_flag=True,
+    help="Also save the plan as JSON (plan.json) for downstream tooling.",
+)
+def plan(technical_constraints: str, structured: bool):
     """Generate a technical plan from the latest specification.
 
     TECHNICAL_CONSTRAINTS: Optional technical preferences or constraints.
@@ -69,48 +94,63 @@ def plan(technical_constraints: str):
     Example:
         acpctl plan "Use Python with FastAPI, PostgreSQL database"
     """
-    click.echo(click.style("🏗️  Generating technical plan...", fg="blue"))
+    _require_api_key()
+
+    from specgraph.workflows.plan import run_plan
+
+    click.secho("🏗️  Generating technical plan...", fg="blue")
 
     try:
-        result = run_plan(technical_constraints)
+        result = run_plan(
+            technical_constraints, on_text=_echo_chunk, structured=structured
+        )
+        click.echo()
 
-        if result.get("error"):
-            click.echo(click.style(f"❌ Error: {result['error']}", fg="red"), err=True)
-            sys.exit(1)
+        _die(result)
 
-        click.echo(click.style("✅ Technical plan generated!", fg="green"))
+        click.secho("✅ Technical plan generated!", fg="green")
         click.echo(f"Location: {result['plan_file']}")
+        if result.get("plan_json_file"):
+            click.echo(f"JSON: {result['plan_json_file']}")
 
     except Exception as e:
-        click.echo(click.style(f"❌ Error: {str(e)}", fg="red"), err=True)
-        sys.exit(1)
+        _fail(str(e))
 
 
 @cli.command()
-def tasks():
+@click.option(
+    "--structured",
+    is_flag=True,
+    help="Also save the tasks as JSON (tasks.json) for downstream tooling.",
+)
+def tasks(structured: bool):
     """Generate task breakdown from the latest specification and plan.
 
     Generates a detailed task list following GitHub's Spec-Kit conventions,
     organized into phases with specific file paths and parallel markers.
 
     Example:
-        acpctl tasks
+        acpctl tasks --structured
     """
-    click.echo(click.style("📋 Generating task breakdown...", fg="blue"))
+    _require_api_key()
+
+    from specgraph.workflows.tasks import run_tasks
+
+    click.secho("📋 Generating task breakdown...", fg="blue")
 
     try:
-        result = run_tasks()
+        result = run_tasks(on_text=_echo_chunk, structured=structured)
+        click.echo()
 
-        if result.get("error"):
-            click.echo(click.style(f"❌ Error: {result['error']}", fg="red"), err=True)
-            sys.exit(1)
+        _die(result)
 
-        click.echo(click.style("✅ Task breakdown generated!", fg="green"))
+        click.secho("✅ Task breakdown generated!", fg="green")
         click.echo(f"Location: {result['tasks_file']}")
+        if result.get("tasks_json_file"):
+            click.echo(f"JSON: {result['tasks_json_file']}")
 
     except Exception as e:
-        click.echo(click.style(f"❌ Error: {str(e)}", fg="red"), err=True)
-        sys.exit(1)
+        _fail(str(e))
 
 
 @cli.command()
@@ -123,73 +163,130 @@ def clarify():
     Example:
         acpctl clarify
     """
-    click.echo(click.style("🔍 Analyzing specification for ambiguities...", fg="blue"))
+    _require_api_key()
 
-    try:
-        # First run: generate questions
-        result = run_clarify()
+    import asyncio
+
+    from specgraph.utils.llm import async_client_session
+    from specgraph.workflows.clarify import run_clarify_async
 
-        if result.get("error"):
-            click.echo(click.style(f"❌ Error: {result['error']}", fg="red"), err=True)
-            sys.exit(1)
+    async def clarify_session() -> dict | None:
+        # Both runs share one client, so answering reuses its connection
+        async with async_client_session():
+            # First run: generate questions
+            result = await run_clarify_async()
 
-        questions = result.get("questions", [])
+            _die(result)
 
-        if not questions:
-            click.echo(
-                click.style(
-                    "✅ No clarifications needed - specification is clear!", fg="green"
+            questions = result.get("questions", [])
+
+            if not questions:
+                click.secho(
+                    "✅ No clarifications needed - specification is clear!",
+                    fg="green",
                 )
-            )
-            return
+                return None
 
-        # Display and collect answers for each question
-        click.echo(
-            click.style(
+            # Display and collect answers for each question
+            click.secho(
                 f"\n📝 Found {len(questions)} area(s) that need clarification:\n",
                 fg="yellow",
             )
-        )
 
-        answers = {}
-        for question in questions:
-            click.echo(click.style(f"\n[{question['category']}]", fg="cyan"))
-            click.echo(f"Q{question['id']}: {question['question']}")
-            click.echo(click.style(f"Context: {question['context']}", fg="dim"))
-            click.echo(
-                click.style(
-                    f"Suggested: {question['suggested_answer']}", fg="dim", italic=True
+            answers = {}
+            for question in questions:
+                click.secho(f"\n[{question['category']}]", fg="cyan")
+                click.echo(f"Q{question['id']}: {question['question']}")
+                click.secho(f"Context: {question['context']}", dim=True)
+                click.secho(
+                    f"Suggested: {question['suggested_answer']}",
+                    dim=True,
+                    italic=True,
                 )
-            )
 
-            # Get user's answer (or use suggested answer if user presses enter)
-            answer = click.prompt(
-                click.style("\nYour answer (press Enter for suggested)", fg="green"),
-                default=question["suggested_answer"],
-                show_default=False,
-            )
+                # Get user's answer (or use suggested answer if user presses enter)
+                answer = click.prompt(
+                    click.style(
+                        "\nYour answer (press Enter for suggested)", fg="green"
+                    ),
+                    default=question["suggested_answer"],
+                    show_default=False,
+                )
 
-            answers[question["id"]] = answer
+                answers[question["id"]] = answer
 
-        # Second run: update specification with answers
-        click.echo(
-            click.style("\n📝 Updating specification with clarifications...", fg="blue")
-        )
+            # Second run: update specification with answers
+            click.secho("\n📝 Updating specification with clarifications...", fg="blue")
 
-        result = run_clarify(answers)
+            result = await run_clarify_async(
+                answers, on_text=_echo_chunk, questions=questions
+            )
+            click.echo()
+            return result
 
-        if result.get("error"):
-            click.echo(click.style(f"❌ Error: {result['error']}", fg="red"), err=True)
-            sys.exit(1)
+    click.secho("🔍 Analyzing specification for ambiguities...", fg="blue")
 
-        click.echo(
-            click.style("✅ Specification updated with clarifications!", fg="green")
-        )
+    try:
+        result = asyncio.run(clarify_session())
+        if result is None:
+            return
+
+        _die(result)
+
+        click.secho("✅ Specification updated with clarifications!", fg="green")
         click.echo(f"Location: {result['spec_path']}/specification.md")
 
     except Exception as e:
-        click.echo(click.style(f"❌ Error: {str(e)}", fg="red"), err=True)
-        sys.exit(1)
+        _fail(str(e))
+
+
+@cli.command("all")
+@click.argument("feature_description")
+@click.argument("technical_constraints", required=False, default="")
+def all_phases(feature_description: str, technical_constraints: str):
+    """Generate specification, plan and tasks using the Message Batches API.
+
+    Each phase is submitted as a message batch, which is billed at half the
+    price of a regular request. Batches may take a while to be processed.
+
+    FEATURE_DESCRIPTION: A description of the feature you want to build.
+
+    TECHNICAL_CONSTRAINTS: Optional technical preferences or constraints.
+
+    Example:
+        acpctl all "Build a photo album organizer" "Use Python and FastAPI"
+    """
+    _require_api_key()
+
+    from specgraph.workflows.batch import run_batch
+
+    click.secho("📦 Submitting pipeline batches...", fg="blue")
+
+    try:
+        with click.progressbar(length=3, label="Processing phases") as bar:
+            ended_phases = set()
+
+            def on_poll(phase: str, batch) -> None:
+                bar.label = f"Processing {phase} ({batch.processing_status})"
+                if batch.processing_status == "ended":
+                    ended_phases.add(phase)
+                    bar.update(1)
+
+            result = run_batch(feature_description, technical_constraints, on_poll)
+
+            # Phases replayed from the node cache never poll
+            if not result.get("error"):
+                bar.label = "Processed phases"
+                bar.update(bar.length - len(ended_phases))
+
+        _die(result)
+
+        click.secho("✅ Specification, plan and tasks generated!", fg="green")
+        click.echo(f"\nSpec Number: {result['spec_number']:03d}")
+        click.echo(f"Location: {result['spec_path']}")
+
+    except Exception as e:
+        _fail(str(e))
 
 
 if __name__ == "__main__":
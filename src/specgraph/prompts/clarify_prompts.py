@@ -46,7 +46,7 @@ Generate questions that are:
 - **Answerable**: Can be resolved with clear, brief answers
 - **Non-redundant**: Don't ask about information already in the spec
 
-**Maximum 5 questions total** - prioritize by impact.
+**Respect the question limit given in the request** - prioritize by impact.
 
 ## Question Format
 
@@ -59,18 +59,20 @@ Return questions in this JSON format:
       "category": "User Experience Edge Cases",
       "question": "What should happen when a user tries to upload a file larger than 10MB?",
       "context": "The spec mentions file upload but doesn't specify size limits or error handling",
-      "suggested_answer": "Reject files over 10MB with error message: 'File too large. Maximum size is 10MB.'"
+      "suggested_answer": "Reject files over 10MB with error message: 'File too large. Maximum size is 10MB.'",
+      "impact": "high"
     }
   ]
 }
 ```
 
 Each question must include:
-- `id`: Sequential number (1-5)
+- `id`: Sequential number starting at 1
 - `category`: One of the six focus areas above
 - `question`: The specific question to ask
 - `context`: Why this matters for implementation
 - `suggested_answer`: A reasonable default answer
+- `impact`: How strongly the answer affects implementation: "high", "medium" or "low"
 
 ## Quality Standards
 
@@ -81,6 +83,24 @@ Questions must:
 - Target requirements and business logic, not technical implementation
 """
 
+# Focus areas from CLARIFY_SYSTEM_PROMPT, each analyzed by a separate request
+FOCUS_AREAS = (
+    "User Experience Edge Cases",
+    "Data Handling & Validation",
+    "Error States & Failure Modes",
+    "Cross-Feature Interactions",
+    "Performance & Scale",
+    "Security & Privacy",
+)
+
+CLARIFY_SYSTEM_BLOCKS = [
+    {
+        "type": "text",
+        "text": CLARIFY_SYSTEM_PROMPT,
+        "cache_control": {"type": "ephemeral"},
+    }
+]
+
 UPDATE_SYSTEM_PROMPT = """You are a technical writer specializing in product specifications.
 
 Your role is to integrate clarifications into product specifications while maintaining consistency, clarity, and proper markdown formatting.
@@ -112,31 +132,57 @@ Your role is to integrate clarifications into product specifications while maint
 Return the complete updated specification with the Clarifications section properly integrated.
 """
 
+UPDATE_SYSTEM_BLOCKS = [
+    {
+        "type": "text",
+        "text": UPDATE_SYSTEM_PROMPT,
+        "cache_control": {"type": "ephemeral"},
+    }
+]
+
 
-def get_analysis_prompt(specification: str) -> str:
-    """Get the prompt for analyzing a specification and generating questions.
+def get_analysis_prompt(specification: str, focus_area: str) -> list[dict]:
+    """Get the prompt for analyzing one focus area as a list of content blocks.
+
+    The specification block is marked as a prompt cache breakpoint. Once the
+    first focus area's response has started, requests for the other focus
+    areas reuse the cached specification prefix and only process their own
+    instructions.
 
     Args:
         specification: The product specification to analyze
+        focus_area: The focus area to generate questions for
 
     Returns:
-        Formatted prompt for question generation
+        User message content blocks for question generation
     """
-    return f"""Analyze the following product specification and identify areas that need clarification.
+    return [
+        {
+            "type": "text",
+            "text": f"""Analyze the following product specification and identify areas that need clarification.
 
 # Product Specification
 {specification}
+""",
+            "cache_control": {"type": "ephemeral"},
+        },
+        {
+            "type": "text",
+            "text": f"""Analyze ONLY the "{focus_area}" focus area. Ignore gaps in other focus areas - they are analyzed separately.
 
-Generate up to 5 high-impact clarifying questions that will improve implementation quality. Focus on gaps, ambiguities, and underspecified areas that would cause confusion during development.
+Generate up to 2 high-impact clarifying questions for this focus area. If the specification already covers it well, return an empty questions array.
 
 Return your response as valid JSON matching the format specified in the system prompt.
 
 Remember:
-- Maximum 5 questions
-- Focus on high-impact areas
-- Include category, question, context, and suggested answer
+- Maximum 2 questions
+- Use "{focus_area}" as the category
+- Rate each question's impact as "high", "medium" or "low"
+- Include category, question, context, suggested answer, and impact
 - Target requirements and business logic, not implementation details
-"""
+""",
+        },
+    ]
 
 
 def get_update_prompt(specification: str, qa_pairs: list[dict]) -> str:
@@ -169,3 +215,78 @@ Return the complete updated specification with:
 
 Ensure the Clarifications section is well-organized and professionally formatted.
 """
+
+
+# Tool for answering the combined analyze-and-update request in one response
+EMIT_CLARIFICATIONS_TOOL = {
+    "name": "emit_clarifications",
+    "description": "Emit the clarifying questions and the updated specification.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "questions": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "id": {"type": "integer"},
+                        "category": {"type": "string"},
+                        "question": {"type": "string"},
+                        "context": {"type": "string"},
+                        "suggested_answer": {"type": "string"},
+                        "impact": {"type": "string", "enum": ["high", "medium", "low"]},
+                    },
+                    "required": ["id", "category", "question", "context"],
+                },
+            },
+            "updated_spec": {
+                "type": "string",
+                "description": "The complete updated specification in markdown",
+            },
+        },
+        "required": ["questions", "updated_spec"],
+    },
+}
+
+
+def get_analyze_and_update_prompt(
+    specification: str, answers: dict[int, str]
+) -> list[dict]:
+    """Get the prompt for generating questions and applying known answers at once.
+
+    Args:
+        specification: The product specification to clarify
+        answers: Answers keyed by the ID of the question they answer
+
+    Returns:
+        User message content blocks for the combined request
+    """
+    answers_text = "\n\n".join(
+        f"**A{question_id}:** {answer}"
+        for question_id, answer in sorted(answers.items())
+    )
+
+    return [
+        {
+            "type": "text",
+            "text": f"""Analyze the following product specification and identify areas that need clarification.
+
+# Product Specification
+{specification}
+""",
+            "cache_control": {"type": "ephemeral"},
+        },
+        {
+            "type": "text",
+            "text": f"""Generate exactly {max(answers)} clarifying questions, numbered from 1 in order of impact. The answers to these questions are already known:
+
+{answers_text}
+
+Then update the specification by adding/updating the Clarifications section with each question and its answer, following the integration requirements from the system prompt.
+
+Call the emit_clarifications tool with:
+1. The questions, in the JSON format specified in the system prompt
+2. The complete updated specification, with all original content preserved
+""",
+        },
+    ]
@@ -14,15 +14,22 @@ Focus on:
 
 Be specific and actionable. Every architectural choice should have clear reasoning."""
 
-PLAN_USER_PROMPT = """Based on the following product specification, create a comprehensive technical plan:
+PLAN_SYSTEM_BLOCKS = [
+    {"type": "text", "text": PLAN_SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}
+]
+
+PLAN_SPEC_PROMPT = """Based on the following product specification, create a comprehensive technical plan:
 
 ## Product Specification
 {specification}
+"""
 
-## Technical Constraints/Preferences
+CONSTRAINTS_SECTION = """## Technical Constraints/Preferences
 {technical_constraints}
 
-Generate a detailed technical plan that includes:
+"""
+
+PLAN_USER_PROMPT = """{constraints_section}Generate a detailed technical plan that includes:
 
 ## Technology Stack
 What technologies, frameworks, and libraries will be used? Include rationale for each choice.
@@ -45,16 +52,129 @@ What technical challenges might arise and how to address them?
 Write in clear, professional markdown. Be specific and actionable."""
 
 
-def get_plan_prompt(specification: str, technical_constraints: str) -> str:
-    """Get the formatted plan prompt.
+def get_plan_prompt(specification: str, technical_constraints: str) -> list[dict]:
+    """Get the plan prompt as a list of content blocks.
+
+    The specification block is marked as a prompt cache breakpoint, so
+    regenerating the plan with different constraints reuses the cached
+    specification prefix.
 
     Args:
         specification: The product specification from the specify phase
         technical_constraints: Technical preferences or constraints
 
     Returns:
-        Formatted prompt for the LLM
+        User message content blocks for the LLM
+    """
+    # Leave the constraints section out entirely when there are none
+    constraints_section = (
+        CONSTRAINTS_SECTION.format(technical_constraints=technical_constraints)
+        if technical_constraints.strip()
+        else ""
+    )
+    return [
+        {
+            "type": "text",
+            "text": PLAN_SPEC_PROMPT.format(specification=specification),
+            "cache_control": {"type": "ephemeral"},
+        },
+        {
+            "type": "text",
+            "text": PLAN_USER_PROMPT.format(constraints_section=constraints_section),
+        },
+    ]
+
+
+# Tool that makes Claude return the technical plan as JSON instead of markdown
+EMIT_PLAN_TOOL = {
+    "name": "emit_plan",
+    "description": "Emit the complete technical plan for the specification.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "title": {"type": "string", "description": "Feature name"},
+            "technology_stack": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "technology": {"type": "string"},
+                        "rationale": {"type": "string"},
+                    },
+                    "required": ["technology", "rationale"],
+                },
+            },
+            "architecture_overview": {"type": "string", "description": "Markdown"},
+            "data_model": {"type": "string", "description": "Markdown"},
+            "api_design": {"type": "string", "description": "Markdown"},
+            "implementation_approach": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "Recommended build sequence, in order",
+            },
+            "risks": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "risk": {"type": "string"},
+                        "mitigation": {"type": "string"},
+                    },
+                    "required": ["risk", "mitigation"],
+                },
+            },
+        },
+        "required": [
+            "title",
+            "technology_stack",
+            "architecture_overview",
+            "data_model",
+            "implementation_approach",
+            "risks",
+        ],
+    },
+}
+
+
+def render_plan_markdown(plan: dict) -> str:
+    """Render an emit_plan tool input as a plan.md file.
+
+    Args:
+        plan: Technical plan matching EMIT_PLAN_TOOL's input schema
+
+    Returns:
+        Markdown technical plan
     """
-    return PLAN_USER_PROMPT.format(
-        specification=specification, technical_constraints=technical_constraints
+    stack = "\n".join(
+        f"- **{item['technology']}** - {item['rationale']}"
+        for item in plan["technology_stack"]
     )
+    steps = "\n".join(
+        f"{number}. {step}"
+        for number, step in enumerate(plan["implementation_approach"], start=1)
+    )
+    risks = "\n".join(
+        f"- **{item['risk']}** - {item['mitigation']}" for item in plan["risks"]
+    )
+    api_design = plan.get("api_design") or "Not applicable."
+
+    return f"""# Technical Plan: {plan['title']}
+
+## Technology Stack
+{stack}
+
+## Architecture Overview
+{plan['architecture_overview']}
+
+## Data Model
+{plan['data_model']}
+
+## API Design
+{api_design}
+
+## Implementation Approach
+{steps}
+
+## Technical Risks & Mitigations
+{risks}
+"""
@@ -18,6 +18,14 @@ Do NOT include:
 - Architecture designs
 """
 
+SPECIFY_SYSTEM_BLOCKS = [
+    {
+        "type": "text",
+        "text": SPECIFY_SYSTEM_PROMPT,
+        "cache_control": {"type": "ephemeral"},
+    }
+]
+
 SPECIFY_USER_PROMPT = """Create a comprehensive product specification for the following feature:
 
 {feature_description}
@@ -102,26 +102,67 @@ Generate a complete tasks.md file with:
 4. Sequential task IDs starting at T001
 """
 
+# Terminator the model emits after the last task, so streaming can stop early
+TASKS_END_MARKER = "<!--END-->"
 
-def get_tasks_prompt(specification: str, plan: str) -> str:
-    """Get the formatted tasks prompt.
+TASKS_END_INSTRUCTION = (
+    f"5. A final line containing only `{TASKS_END_MARKER}`, after which you stop\n"
+)
+
+
+TASKS_SYSTEM_BLOCKS = [
+    {
+        "type": "text",
+        "text": TASKS_SYSTEM_PROMPT + TASKS_END_INSTRUCTION,
+        "cache_control": {"type": "ephemeral"},
+    }
+]
+
+# Tool output has no text to terminate, so it goes without the end marker
+TASKS_STRUCTURED_SYSTEM_BLOCKS = [
+    {
+        "type": "text",
+        "text": TASKS_SYSTEM_PROMPT,
+        "cache_control": {"type": "ephemeral"},
+    }
+]
+
+
+def get_tasks_prompt(specification: str, plan: str) -> list[dict]:
+    """Get the tasks prompt as a list of content blocks.
+
+    The specification and plan are separate blocks, each marked as a prompt
+    cache breakpoint. Regenerating tasks for the same specification with a
+    revised plan then reuses the cached specification prefix, and only the
+    plan and the closing instructions are processed again.
 
     Args:
         specification: The product specification (PRD)
         plan: The technical implementation plan
 
     Returns:
-        Formatted prompt for task generation
+        User message content blocks for task generation
     """
-    return f"""Based on the following product specification and technical plan, generate a comprehensive task breakdown following the Spec-Kit format.
+    return [
+        {
+            "type": "text",
+            "text": f"""Based on the following product specification and technical plan, generate a comprehensive task breakdown following the Spec-Kit format.
 
 # Product Specification
 {specification}
-
-# Technical Implementation Plan
+""",
+            "cache_control": {"type": "ephemeral"},
+        },
+        {
+            "type": "text",
+            "text": f"""# Technical Implementation Plan
 {plan}
-
-Generate a complete tasks.md file that breaks down this implementation into specific, actionable tasks. Follow all the formatting conventions and organization principles from the system prompt.
+""",
+            "cache_control": {"type": "ephemeral"},
+        },
+        {
+            "type": "text",
+            "text": """Generate a complete tasks.md file that breaks down this implementation into specific, actionable tasks. Follow all the formatting conventions and organization principles from the system prompt.
 
 Remember:
 - Use GitHub markdown checkboxes: `- [ ]`
@@ -131,4 +172,83 @@ Remember:
 - Always include specific file paths in descriptions
 - No time estimates
 - TDD approach: tests before implementation
-"""
+""",
+        },
+    ]
+
+
+# Tool that makes Claude return the task breakdown as JSON instead of markdown
+EMIT_TASKS_TOOL = {
+    "name": "emit_tasks",
+    "description": "Emit the complete task breakdown for the feature.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "title": {"type": "string", "description": "Feature name"},
+            "phases": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "name": {
+                            "type": "string",
+                            "description": 'Phase heading, e.g. "Phase 1: Setup"',
+                        },
+                        "tasks": {
+                            "type": "array",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "id": {
+                                        "type": "string",
+                                        "description": "Task ID, e.g. T001",
+                                    },
+                                    "parallel": {
+                                        "type": "boolean",
+                                        "description": "Whether the task can "
+                                        "run in parallel",
+                                    },
+                                    "story": {
+                                        "type": ["string", "null"],
+                                        "description": "User story label, e.g. US1",
+                                    },
+                                    "description": {
+                                        "type": "string",
+                                        "description": "Actionable description "
+                                        "including the exact file path",
+                                    },
+                                    "file_path": {
+                                        "type": ["string", "null"],
+                                        "description": "File the task touches",
+                                    },
+                                },
+                                "required": ["id", "parallel", "description"],
+                            },
+                        },
+                    },
+                    "required": ["name", "tasks"],
+                },
+            },
+        },
+        "required": ["title", "phases"],
+    },
+}
+
+
+def render_tasks_markdown(tasks: dict) -> str:
+    """Render an emit_tasks tool input as a Spec-Kit tasks.md file.
+
+    Args:
+        tasks: Task breakdown matching EMIT_TASKS_TOOL's input schema
+
+    Returns:
+        Markdown task list
+    """
+    lines = [f"# Tasks: {tasks['title']}"]
+    for phase in tasks["phases"]:
+        lines.append(f"\n## {phase['name']}\n")
+        for task in phase["tasks"]:
+            parallel = " [P]" if task.get("parallel") else ""
+            story = f" [{task['story']}]" if task.get("story") else ""
+            lines.append(f"- [ ] {task['id']}{parallel}{story} {task['description']}")
+    return "\n".join(lines) + "\n"
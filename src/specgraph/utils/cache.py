@@ -0,0 +1,105 @@
+"""Node-level result caching for LLM-backed workflow nodes."""
+
+import json
+import threading
+from collections.abc import Mapping, Sequence
+from functools import lru_cache
+from pathlib import Path
+
+from langgraph.cache.base import BaseCache, FullKey, Namespace
+from langgraph.cache.sqlite import SqliteCache
+from langgraph.types import CachePolicy
+
+try:
+    # Optional C-accelerated JSON encoder (pip install specgraph[speedups])
+    import orjson
+except ImportError:
+    orjson = None
+
+# Cached Claude responses are reused for an hour
+CACHE_TTL = 3600
+
+
+def cache_policy(*fields: str) -> CachePolicy:
+    """Build a node cache policy keyed only on the given state fields.
+
+    Fields the node doesn't read (such as outputs of other nodes) are left
+    out of the cache key, so the node hits the cache whenever its own inputs
+    are unchanged. The key is computed on every run of the node, so it is
+    serialized with orjson when available.
+
+    Args:
+        fields: Names of the state fields the node's result depends on
+
+    Returns:
+        Cache policy for StateGraph.add_node
+    """
+
+    def key_func(state: dict) -> str | bytes:
+        values = [state.get(field) for field in fields]
+        if orjson:
+            # Keys are hashed as bytes, so orjson's output can be used as is
+            return orjson.dumps(values, default=str, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(values, default=str)
+
+    return CachePolicy(key_func=key_func, ttl=CACHE_TTL)
+
+
+class LazySqliteCache(BaseCache):
+    """SQLite node cache that opens its database on first use.
+
+    Building a workflow doesn't touch the disk, so a run that fails before
+    reaching a cached node (e.g. because no specs exist yet) leaves no cache
+    file behind.
+    """
+
+    def __init__(self, path: Path):
+        """Initialize the cache without opening the database.
+
+        Args:
+            path: Path of the SQLite database file
+        """
+        super().__init__()
+        self.path = path
+        self._cache: SqliteCache | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self) -> SqliteCache:
+        """SQLite cache, created along with its directory on first access."""
+        with self._lock:
+            if self._cache is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._cache = SqliteCache(path=str(self.path), serde=self.serde)
+            return self._cache
+
+    def get(self, keys: Sequence[FullKey]) -> dict:
+        return self.cache.get(keys)
+
+    async def aget(self, keys: Sequence[FullKey]) -> dict:
+        return await self.cache.aget(keys)
+
+    def set(self, pairs: Mapping[FullKey, tuple]) -> None:
+        self.cache.set(pairs)
+
+    async def aset(self, pairs: Mapping[FullKey, tuple]) -> None:
+        await self.cache.aset(pairs)
+
+    def clear(self, namespaces: Sequence[Namespace] | None = None) -> None:
+        self.cache.clear(namespaces)
+
+    async def aclear(self, namespaces: Sequence[Namespace] | None = None) -> None:
+        await self.cache.aclear(namespaces)
+
+
+@lru_cache(maxsize=1)
+def get_node_cache(specs_dir: Path = Path("specs")) -> LazySqliteCache:
+    """Get the disk-backed node cache, so results survive CLI restarts.
+
+    Args:
+        specs_dir: Directory containing specifications
+
+    Returns:
+        SQLite cache stored in specs_dir/.cache.db, created on first use
+    """
+    return LazySqliteCache(specs_dir / ".cache.db")
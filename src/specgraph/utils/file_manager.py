@@ -1,36 +1,104 @@
 """File management utilities for creating and organizing specifications."""
 
+import json
+import os
 import re
+from collections.abc import AsyncIterable, Iterator
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
-from typing import Tuple
+from typing import TextIO, Tuple
 
+# Runs of anything other than lowercase letters and digits become one hyphen
+_SLUG_INVALID = re.compile(r"[^a-z0-9]+")
+
+# Directories this process has already created or confirmed to exist
+_known_dirs: set[Path] = set()
 
-def get_next_spec_number(specs_dir: Path = Path("specs")) -> int:
-    """Get the next available specification number.
+
+def _ensure_dir(path: Path) -> None:
+    """Create a directory and its parents, once per process.
+
+    Args:
+        path: Directory that should exist
+    """
+    if path not in _known_dirs:
+        path.mkdir(parents=True, exist_ok=True)
+        _known_dirs.add(path)
+
+
+def _spec_number(name: str) -> int | None:
+    """Get the spec number from a directory name like "001-feature-name".
+
+    Args:
+        name: Directory name
+
+    Returns:
+        Spec number, or None if the name has no number prefix
+    """
+    prefix, separator, _ = name.partition("-")
+    return int(prefix) if separator and prefix.isdecimal() else None
+
+
+@lru_cache(maxsize=1)
+def _scan_specs(specs_dir: Path, mtime_ns: int) -> Tuple[int, str | None]:
+    """Find the highest-numbered specification directory in a single pass.
+
+    Results are cached per directory modification time, which changes
+    whenever a spec directory is added or removed.
+
+    Args:
+        specs_dir: Absolute path of the specifications directory
+        mtime_ns: Modification time of specs_dir, used as part of the cache key
+
+    Returns:
+        Tuple of (highest spec number, directory name), or (0, None)
+    """
+    # DirEntry.is_dir() uses the file type from the directory listing, so
+    # unlike Path.is_dir() it usually needs no extra stat call per entry
+    with os.scandir(specs_dir) as entries:
+        return max(
+            (
+                (number, entry.name)
+                for entry in entries
+                if (number := _spec_number(entry.name)) is not None and entry.is_dir()
+            ),
+            key=lambda spec: spec[0],
+            default=(0, None),
+        )
+
+
+def _latest_spec(specs_dir: Path) -> Tuple[int, str | None]:
+    """Get the highest spec number and directory name in specs_dir.
 
     Args:
         specs_dir: Directory containing specifications
 
     Returns:
-        Next available spec number (e.g., 1, 2, 3...)
+        Tuple of (highest spec number, directory name), or (0, None)
     """
-    if not specs_dir.exists():
-        return 1
+    try:
+        mtime_ns = specs_dir.stat().st_mtime_ns
+    except FileNotFoundError:
+        return 0, None
+
+    return _scan_specs(specs_dir.absolute(), mtime_ns)
 
-    existing_specs = [d for d in specs_dir.iterdir() if d.is_dir()]
-    if not existing_specs:
-        return 1
 
-    # Extract numbers from directory names like "001-feature-name"
-    numbers = []
-    for spec_dir in existing_specs:
-        match = re.match(r"^(\d+)-", spec_dir.name)
-        if match:
-            numbers.append(int(match.group(1)))
+def get_next_spec_number(specs_dir: Path = Path("specs")) -> int:
+    """Get the next available specification number.
+
+    Args:
+        specs_dir: Directory containing specifications
 
-    return max(numbers) + 1 if numbers else 1
+    Returns:
+        Next available spec number (e.g., 1, 2, 3...)
+    """
+    number, _ = _latest_spec(specs_dir)
+    return number + 1
 
 
+@lru_cache(maxsize=128)
 def slugify(text: str) -> str:
     """Convert text to a URL-friendly slug.
 
@@ -40,18 +108,9 @@ def slugify(text: str) -> str:
     Returns:
         Slugified text (e.g., "My Feature" -> "my-feature")
     """
-    # Convert to lowercase
-    text = text.lower()
-    # Replace spaces and underscores with hyphens
-    text = re.sub(r"[\s_]+", "-", text)
-    # Remove non-alphanumeric characters except hyphens
-    text = re.sub(r"[^a-z0-9-]", "", text)
-    # Remove multiple consecutive hyphens
-    text = re.sub(r"-+", "-", text)
-    # Strip leading/trailing hyphens
-    text = text.strip("-")
-    # Limit length
-    return text[:50]
+    # Lowercase, collapse every run of invalid characters (spaces, underscores,
+    # punctuation, hyphens) into a single hyphen, strip the ends and limit length
+    return _SLUG_INVALID.sub("-", text.lower()).strip("-")[:50]
 
 
 def create_spec_directory(
@@ -66,18 +125,49 @@ def create_spec_directory(
     Returns:
         Tuple of (spec_directory_path, spec_number)
     """
-    specs_dir.mkdir(parents=True, exist_ok=True)
-
     spec_number = get_next_spec_number(specs_dir)
     slug = slugify(feature_name)
     dir_name = f"{spec_number:03d}-{slug}"
 
+    # Always a new directory; parents=True creates specs_dir as well if needed
     spec_path = specs_dir / dir_name
     spec_path.mkdir(parents=True, exist_ok=True)
+    _known_dirs.add(spec_path)
+
+    # Directory mtimes are coarse, so a spec created right after this one
+    # could otherwise be handed the same number from the cached scan
+    _scan_specs.cache_clear()
 
     return spec_path, spec_number
 
 
+@contextmanager
+def _atomic_write(file_path: Path) -> Iterator[TextIO]:
+    """Open a file for writing that only replaces file_path once complete.
+
+    Content is written to a temporary file next to file_path, synced to disk
+    and renamed over file_path, so a crash or error mid-write never leaves a
+    truncated file behind.
+
+    Args:
+        file_path: Path where file should be saved
+
+    Yields:
+        Text file handle to write the content to
+    """
+    _ensure_dir(file_path.parent)
+    tmp_path = file_path.with_name(file_path.name + ".tmp")
+    try:
+        with tmp_path.open("w", encoding="utf-8") as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
 def save_markdown(content: str, file_path: Path) -> None:
     """Save markdown content to a file.
 
@@ -85,8 +175,32 @@ def save_markdown(content: str, file_path: Path) -> None:
         content: Markdown content to save
         file_path: Path where file should be saved
     """
-    file_path.parent.mkdir(parents=True, exist_ok=True)
-    file_path.write_text(content, encoding="utf-8")
+    with _atomic_write(file_path) as f:
+        f.write(content)
+
+
+async def save_markdown_stream(chunks: AsyncIterable[str], file_path: Path) -> None:
+    """Save markdown content to a file as it is being produced.
+
+    Args:
+        chunks: Async iterable of markdown text chunks, e.g. a Claude text stream
+        file_path: Path where file should be saved
+    """
+    with _atomic_write(file_path) as f:
+        async for chunk in chunks:
+            f.write(chunk)
+
+
+def save_json(data: dict, file_path: Path) -> None:
+    """Save structured data to a JSON file.
+
+    Args:
+        data: JSON-serializable data to save
+        file_path: Path where file should be saved
+    """
+    with _atomic_write(file_path) as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
 
 
 def find_latest_spec(specs_dir: Path = Path("specs")) -> Path | None:
@@ -98,16 +212,66 @@ def find_latest_spec(specs_dir: Path = Path("specs")) -> Path | None:
     Returns:
         Path to latest spec directory, or None if no specs exist
     """
-    if not specs_dir.exists():
-        return None
+    _, name = _latest_spec(specs_dir)
+    return specs_dir / name if name else None
+
+
+@lru_cache(maxsize=8)
+def _read_cached(file_path: Path, mtime_ns: int) -> str:
+    """Read a text file, caching its content per modification time.
+
+    Args:
+        file_path: Absolute path of the file to read
+        mtime_ns: Modification time of file_path, used as part of the cache key
+
+    Returns:
+        File content
+    """
+    return file_path.read_text(encoding="utf-8")
+
+
+def read_markdown(file_path: Path) -> str:
+    """Read a markdown file, reusing an earlier read if it hasn't changed.
+
+    Args:
+        file_path: Path of the file to read
+
+    Returns:
+        Markdown content
+
+    Raises:
+        FileNotFoundError: If the file doesn't exist
+    """
+    mtime_ns = file_path.stat().st_mtime_ns
+    return _read_cached(file_path.absolute(), mtime_ns)
+
+
+def load_latest_spec(specs_dir: Path = Path("specs")) -> Tuple[Path, str]:
+    """Load the specification from the most recent spec directory.
+
+    Args:
+        specs_dir: Directory containing specifications
+
+    Returns:
+        Tuple of (spec_directory_path, specification)
+
+    Raises:
+        FileNotFoundError: If there is no specification, with a message
+            telling the user how to create one
+    """
+    spec_path = find_latest_spec(specs_dir)
+
+    if not spec_path:
+        raise FileNotFoundError("No specifications found. Run 'acpctl specify' first.")
 
-    existing_specs = [d for d in specs_dir.iterdir() if d.is_dir()]
-    if not existing_specs:
-        return None
+    spec_file = spec_path / "specification.md"
 
-    # Sort by spec number (extracted from directory name)
-    def get_spec_number(spec_dir: Path) -> int:
-        match = re.match(r"^(\d+)-", spec_dir.name)
-        return int(match.group(1)) if match else 0
+    try:
+        specification = read_markdown(spec_file)
+    except FileNotFoundError:
+        raise FileNotFoundError(
+            f"Specification file not found at {spec_file}. "
+            "Run 'acpctl specify' first."
+        ) from None
 
-    return max(existing_specs, key=get_spec_number)
+    return spec_path, specification
@@ -0,0 +1,197 @@
+"""Helpers for calling Claude from workflow nodes."""
+
+import asyncio
+import atexit
+from collections.abc import AsyncIterable, AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from functools import lru_cache
+
+from anthropic import (
+    Anthropic,
+    AsyncAnthropic,
+    DefaultAsyncHttpxClient,
+    DefaultHttpxClient,
+)
+from anthropic.types import Message
+from langchain_core.runnables import RunnableConfig
+
+# Async connections are bound to the event loop that opened them, so each
+# loop gets its own client for the duration of an async_client_session()
+_ASYNC_CLIENTS: dict[asyncio.AbstractEventLoop, AsyncAnthropic] = {}
+
+
+@lru_cache(maxsize=1)
+def get_client() -> Anthropic:
+    """Get the Claude client shared by every node in the process.
+
+    The client is created on first use. Its pooled HTTP/2 connection is
+    reused by every later call, so chained phases don't repeat the TLS
+    handshake.
+
+    Returns:
+        Anthropic client
+    """
+    http_client = DefaultHttpxClient(http2=True)
+    atexit.register(http_client.close)
+    return Anthropic(http_client=http_client)
+
+
+@asynccontextmanager
+async def async_client_session() -> AsyncIterator[AsyncAnthropic]:
+    """Share one async Claude client on the running event loop.
+
+    Every node called inside the block reuses the client's pooled HTTP/2
+    connections, and the client is closed when the block exits. Nested
+    sessions reuse the outer session's client, so chained workflow runs
+    don't repeat the TLS handshake.
+
+    Yields:
+        AsyncAnthropic client for the running event loop
+    """
+    loop = asyncio.get_running_loop()
+    if loop in _ASYNC_CLIENTS:
+        yield _ASYNC_CLIENTS[loop]
+        return
+
+    client = AsyncAnthropic(http_client=DefaultAsyncHttpxClient(http2=True))
+    _ASYNC_CLIENTS[loop] = client
+    try:
+        yield client
+    finally:
+        del _ASYNC_CLIENTS[loop]
+        await client.close()
+
+
+def get_async_client() -> AsyncAnthropic:
+    """Get the async Claude client of the running event loop's session.
+
+    Returns:
+        AsyncAnthropic client opened by async_client_session()
+
+    Raises:
+        RuntimeError: If no async_client_session() is active on the loop
+    """
+    try:
+        return _ASYNC_CLIENTS[asyncio.get_running_loop()]
+    except KeyError:
+        raise RuntimeError(
+            "get_async_client() must be called inside async_client_session()"
+        ) from None
+
+
+def get_text_callback(config: RunnableConfig) -> Callable[[str], None] | None:
+    """Get the optional on_text callback passed to a workflow run.
+
+    Args:
+        config: Runnable config of the current workflow run
+
+    Returns:
+        Callback receiving each streamed text chunk, or None
+    """
+    return config.get("configurable", {}).get("on_text")
+
+
+async def echo_text(
+    chunks: AsyncIterable[str], on_text: Callable[[str], None] | None
+) -> AsyncIterator[str]:
+    """Pass text chunks through, handing each one to on_text as well.
+
+    Args:
+        chunks: Async iterable of text chunks, e.g. a Claude text stream
+        on_text: Optional callback receiving each chunk
+
+    Yields:
+        The original text chunks
+    """
+    async for chunk in chunks:
+        if on_text:
+            on_text(chunk)
+        yield chunk
+
+
+def tool_request(request: dict, tool: dict) -> dict:
+    """Turn a Claude request into one that must answer through a tool.
+
+    Args:
+        request: Keyword arguments for messages.create
+        tool: Tool definition whose input schema the answer must follow
+
+    Returns:
+        Request parameters forcing Claude to call the tool
+    """
+    return {
+        **request,
+        "tools": [tool],
+        "tool_choice": {"type": "tool", "name": tool["name"]},
+    }
+
+
+def collect_text(message: Message) -> str:
+    """Get the full text of a Claude response.
+
+    Args:
+        message: Claude response message
+
+    Returns:
+        Text of all text blocks, concatenated in order
+    """
+    return "".join(block.text for block in message.content if block.type == "text")
+
+
+def get_tool_input(message: Message, tool_name: str) -> dict:
+    """Get the parsed input of a tool call from a Claude response.
+
+    Args:
+        message: Claude response message
+        tool_name: Name of the tool that was called
+
+    Returns:
+        Tool input, already parsed from JSON by the SDK
+
+    Raises:
+        ValueError: If the response contains no call to the tool, or was cut
+            off before the tool input was complete
+    """
+    if message.stop_reason == "max_tokens":
+        raise ValueError(
+            f"Claude response hit max_tokens before the {tool_name} tool input "
+            "was complete"
+        )
+    for block in message.content:
+        if block.type == "tool_use" and block.name == tool_name:
+            return block.input
+    raise ValueError(f"Claude response did not call the {tool_name} tool")
+
+
+async def stop_at(chunks: AsyncIterable[str], marker: str) -> AsyncIterator[str]:
+    """Pass text chunks through until the marker appears.
+
+    Stopping lets the caller close the stream instead of waiting for any
+    output the model produces after the marker. The marker itself and
+    everything after it are dropped, even if it is split across chunks.
+
+    Args:
+        chunks: Async iterable of text chunks, e.g. a Claude text stream
+        marker: Text that ends the useful output
+
+    Yields:
+        Text chunks up to the marker
+    """
+    held = ""
+    async for chunk in chunks:
+        text = held + chunk
+        end = text.find(marker)
+        if end != -1:
+            if end:
+                yield text[:end]
+            return
+        # Hold back a tail that could be the start of a split marker
+        keep = next(
+            (k for k in range(len(marker) - 1, 0, -1) if text.endswith(marker[:k])),
+            0,
+        )
+        held = text[-keep:] if keep else ""
+        if len(text) > keep:
+            yield text[: len(text) - keep]
+    if held:
+        yield held
@@ -0,0 +1,334 @@
+"""Batch workflow - Run specify, plan and tasks through the Message Batches API."""
+
+import asyncio
+import time
+from collections.abc import Callable
+from functools import lru_cache
+from pathlib import Path
+from typing import TypedDict
+
+from anthropic import Anthropic
+from anthropic.types.messages import MessageBatch
+from anthropic.types.messages.batch_create_params import Request
+from langchain_core.runnables import RunnableConfig
+from langgraph.graph import END, START, StateGraph
+
+from specgraph.prompts.tasks_prompts import TASKS_END_MARKER
+from specgraph.utils.cache import cache_policy, get_node_cache
+from specgraph.utils.file_manager import create_spec_directory, save_markdown
+from specgraph.utils.llm import collect_text, get_client
+from specgraph.workflows.plan import build_plan_request
+from specgraph.workflows.specify import analyze_input, build_specification_request
+from specgraph.workflows.tasks import build_tasks_request
+
+
+class BatchProcessor:
+    """Submit Claude requests as a message batch and collect their results.
+
+    Batched requests are billed at half the price of regular requests.
+    Requests within one batch are processed in parallel, so only
+    independent requests should share a batch.
+    """
+
+    def __init__(self, client: Anthropic | None = None, poll_interval: float = 5.0):
+        """Initialize the processor.
+
+        Args:
+            client: Anthropic client to use (the shared client if omitted)
+            poll_interval: Seconds to wait between batch status checks
+        """
+        self.client = client or get_client()
+        self.poll_interval = poll_interval
+
+    def submit(self, requests: dict[str, dict]) -> str:
+        """Submit a batch of requests.
+
+        Args:
+            requests: Mapping of custom IDs to messages.create parameters
+
+        Returns:
+            ID of the created batch
+        """
+        batch = self.client.messages.batches.create(
+            requests=[
+                Request(custom_id=custom_id, params=params)
+                for custom_id, params in requests.items()
+            ]
+        )
+        return batch.id
+
+    def wait(
+        self,
+        batch_id: str,
+        on_poll: Callable[[MessageBatch], None] | None = None,
+    ) -> MessageBatch:
+        """Poll a batch until processing has ended.
+
+        Args:
+            batch_id: ID of the batch to wait for
+            on_poll: Optional callback invoked with the batch after each poll
+
+        Returns:
+            The ended batch
+        """
+        while True:
+            batch = self.client.messages.batches.retrieve(batch_id)
+            if on_poll:
+                on_poll(batch)
+            if batch.processing_status == "ended":
+                return batch
+            time.sleep(self.poll_interval)
+
+    def results(self, batch_id: str) -> dict[str, str]:
+        """Collect the text of every request in an ended batch.
+
+        Args:
+            batch_id: ID of the ended batch
+
+        Returns:
+            Mapping of custom IDs to response text
+
+        Raises:
+            RuntimeError: If any request in the batch did not succeed
+        """
+        texts = {}
+        for entry in self.client.messages.batches.results(batch_id):
+            if entry.result.type != "succeeded":
+                raise RuntimeError(
+                    f"Batch request '{entry.custom_id}' {entry.result.type}"
+                )
+            texts[entry.custom_id] = collect_text(entry.result.message)
+        return texts
+
+    def run(
+        self,
+        requests: dict[str, dict],
+        on_poll: Callable[[MessageBatch], None] | None = None,
+    ) -> dict[str, str]:
+        """Submit a batch, wait for it to end and return its results.
+
+        Args:
+            requests: Mapping of custom IDs to messages.create parameters
+            on_poll: Optional callback invoked with the batch after each poll
+
+        Returns:
+            Mapping of custom IDs to response text
+        """
+        batch_id = self.submit(requests)
+        self.wait(batch_id, on_poll)
+        return self.results(batch_id)
+
+
+class BatchState(TypedDict):
+    """State for the batch pipeline workflow."""
+
+    feature_description: str
+    technical_constraints: str
+    specification: str
+    plan: str
+    tasks: str
+    spec_path: Path | None
+    spec_number: int
+    error: str | None
+
+
+def _run_phase(phase: str, params: dict, config: RunnableConfig) -> dict:
+    """Run a single pipeline phase as its own batch.
+
+    Failures raise rather than setting "error", so they are never cached.
+
+    Args:
+        phase: Phase name, used as the batch request's custom ID
+        params: messages.create parameters for the phase
+        config: Runnable config carrying the optional on_poll callback
+
+    Returns:
+        Partial state with the phase output
+    """
+    on_poll = config.get("configurable", {}).get("on_poll")
+
+    def poll(batch: MessageBatch) -> None:
+        if on_poll:
+            on_poll(phase, batch)
+
+    results = BatchProcessor().run({phase: params}, poll)
+
+    return {phase: results[phase]}
+
+
+def batch_specification(state: BatchState, config: RunnableConfig) -> dict:
+    """Generate the specification in a batch.
+
+    Args:
+        state: Current workflow state
+        config: Runnable config
+
+    Returns:
+        Updated state with generated specification
+    """
+    return _run_phase(
+        "specification",
+        build_specification_request(state["feature_description"]),
+        config,
+    )
+
+
+def batch_plan(state: BatchState, config: RunnableConfig) -> dict:
+    """Generate the plan in a batch once the specification is available.
+
+    Args:
+        state: Current workflow state
+        config: Runnable config
+
+    Returns:
+        Updated state with generated plan
+    """
+    return _run_phase(
+        "plan",
+        build_plan_request(state["specification"], state["technical_constraints"]),
+        config,
+    )
+
+
+def batch_tasks(state: BatchState, config: RunnableConfig) -> dict:
+    """Generate the task breakdown in a batch once the plan is available.
+
+    Args:
+        state: Current workflow state
+        config: Runnable config
+
+    Returns:
+        Updated state with generated tasks
+    """
+    result = _run_phase(
+        "tasks", build_tasks_request(state["specification"], state["plan"]), config
+    )
+
+    # Batch results aren't streamed, so the end marker is still in the text
+    tasks, _, _ = result["tasks"].partition(TASKS_END_MARKER)
+    return {"tasks": tasks}
+
+
+async def save_artifacts(state: BatchState) -> dict:
+    """Save the specification, plan and tasks to a new spec directory.
+
+    The files are independent, so they are written concurrently.
+
+    Args:
+        state: Current workflow state
+
+    Returns:
+        Updated state with spec path information
+    """
+    spec_path, spec_number = create_spec_directory(state["feature_description"])
+
+    artifacts = [
+        (state["specification"], spec_path / "specification.md"),
+        (state["plan"], spec_path / "plan.md"),
+        (state["tasks"], spec_path / "tasks.md"),
+    ]
+    await asyncio.gather(
+        *(
+            asyncio.to_thread(save_markdown, content, file_path)
+            for content, file_path in artifacts
+        )
+    )
+
+    return {"spec_path": spec_path, "spec_number": spec_number}
+
+
+def should_continue(state: BatchState) -> str:
+    """Determine if the pipeline should continue or end with error.
+
+    Args:
+        state: Current workflow state
+
+    Returns:
+        "continue" or END
+    """
+    if state.get("error"):
+        return END
+    return "continue"
+
+
+@lru_cache(maxsize=1)
+def build_batch_workflow() -> StateGraph:
+    """Build the batch pipeline workflow graph.
+
+    Phase results are cached, so re-running the pipeline with an unchanged
+    feature description reuses the earlier batches.
+
+    Returns:
+        Compiled LangGraph workflow
+    """
+    workflow = StateGraph(BatchState)
+
+    # Add nodes
+    workflow.add_node("analyze", analyze_input)
+    workflow.add_node(
+        "specify_batch",
+        batch_specification,
+        cache_policy=cache_policy("feature_description"),
+    )
+    workflow.add_node(
+        "plan_batch",
+        batch_plan,
+        cache_policy=cache_policy("specification", "technical_constraints"),
+    )
+    workflow.add_node(
+        "tasks_batch", batch_tasks, cache_policy=cache_policy("specification", "plan")
+    )
+    workflow.add_node("save", save_artifacts)
+
+    # Add edges - each phase depends on the previous one, so batches are chained
+    workflow.add_edge(START, "analyze")
+    workflow.add_conditional_edges(
+        "analyze", should_continue, {"continue": "specify_batch", END: END}
+    )
+    workflow.add_conditional_edges(
+        "specify_batch", should_continue, {"continue": "plan_batch", END: END}
+    )
+    workflow.add_conditional_edges(
+        "plan_batch", should_continue, {"continue": "tasks_batch", END: END}
+    )
+    workflow.add_conditional_edges(
+        "tasks_batch", should_continue, {"continue": "save", END: END}
+    )
+    workflow.add_edge("save", END)
+
+    return workflow.compile(cache=get_node_cache())
+
+
+def run_batch(
+    feature_description: str,
+    technical_constraints: str = "",
+    on_poll: Callable[[str, MessageBatch], None] | None = None,
+) -> BatchState:
+    """Run the specify, plan and tasks phases through the Message Batches API.
+
+    Args:
+        feature_description: Description of the feature to specify
+        technical_constraints: Technical preferences or constraints
+        on_poll: Optional callback invoked with the phase name and batch
+                after each status poll
+
+    Returns:
+        Final workflow state
+    """
+    initial_state: BatchState = {
+        "feature_description": feature_description,
+        "technical_constraints": technical_constraints,
+        "specification": "",
+        "plan": "",
+        "tasks": "",
+        "spec_path": None,
+        "spec_number": 0,
+        "error": None,
+    }
+
+    workflow = build_batch_workflow()
+
+    result = asyncio.run(
+        workflow.ainvoke(initial_state, {"configurable": {"on_poll": on_poll}})
+    )
+    return result
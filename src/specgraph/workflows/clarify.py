@@ -1,19 +1,62 @@
 """Clarify workflow - Generate and integrate clarifying questions using LangGraph."""
 
+import asyncio
 import json
+import logging
+import re
+from collections.abc import Callable
+from functools import lru_cache
 from pathlib import Path
 from typing import TypedDict
 
-from anthropic import Anthropic
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import END, START, StateGraph
 
 from specgraph.prompts.clarify_prompts import (
-    CLARIFY_SYSTEM_PROMPT,
-    UPDATE_SYSTEM_PROMPT,
+    CLARIFY_SYSTEM_BLOCKS,
+    EMIT_CLARIFICATIONS_TOOL,
+    FOCUS_AREAS,
+    UPDATE_SYSTEM_BLOCKS,
     get_analysis_prompt,
+    get_analyze_and_update_prompt,
     get_update_prompt,
 )
-from specgraph.utils.file_manager import find_latest_spec, save_markdown
+from specgraph.utils.cache import cache_policy, get_node_cache
+from specgraph.utils.file_manager import load_latest_spec, save_markdown
+from specgraph.utils.llm import (
+    async_client_session,
+    collect_text,
+    get_async_client,
+    get_text_callback,
+    get_tool_input,
+    tool_request,
+)
+
+try:
+    # Optional C-accelerated JSON parser (pip install specgraph[speedups])
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+logger = logging.getLogger(__name__)
+
+# Body of the first markdown code block, with or without a json language tag
+_FENCE_RE = re.compile(r"```\s*(?:json)?\s*(.*?)```", re.DOTALL)
+
+# Body of a response that is wrapped in a single markdown code block
+_MD_FENCE_RE = re.compile(r"\A\s*```(?:markdown)?\n?(.*?)\n?```\s*\Z", re.DOTALL)
+
+# Maximum number of questions asked per clarify run
+MAX_QUESTIONS = 5
+
+# Maximum number of focus areas analyzed concurrently
+MAX_CONCURRENCY = 6
+
+# Sort order for question impact ratings
+IMPACT_RANK = {"high": 0, "medium": 1, "low": 2}
+
+# Reruns on an unchanged specification reuse each focus area's prompt blocks
+_analysis_prompt = lru_cache(maxsize=32)(get_analysis_prompt)
 
 
 class ClarifyState(TypedDict):
@@ -23,7 +66,6 @@ class ClarifyState(TypedDict):
     specification: str
     questions: list[dict] | None
     answers: dict[int, str] | None
-    updated_spec: str
     error: str | None
 
 
@@ -36,22 +78,10 @@ def load_specification(state: ClarifyState) -> dict:
     Returns:
         Updated state with loaded specification
     """
-    # Find the latest spec directory
-    spec_path = find_latest_spec()
-
-    if not spec_path:
-        return {"error": "No specifications found. Run 'acpctl specify' first."}
-
-    spec_file = spec_path / "specification.md"
-
-    if not spec_file.exists():
-        return {
-            "error": f"Specification file not found at {spec_file}. "
-            "Run 'acpctl specify' first."
-        }
-
     try:
-        specification = spec_file.read_text(encoding="utf-8")
+        spec_path, specification = load_latest_spec()
+    except FileNotFoundError as e:
+        return {"error": str(e)}
     except Exception as e:
         return {"error": f"Failed to read specification: {str(e)}"}
 
@@ -62,126 +92,256 @@ def load_specification(state: ClarifyState) -> dict:
     }
 
 
-def analyze_and_generate_questions(state: ClarifyState) -> dict:
+def parse_questions(response_text: str) -> list[dict]:
+    """Parse the questions JSON from a Claude response.
+
+    Args:
+        response_text: Response text, optionally wrapped in a code block
+
+    Returns:
+        List of question dicts
+
+    Raises:
+        ValueError: If the questions can't be parsed
+    """
+    # Extract JSON from a markdown code block if present
+    match = _FENCE_RE.search(response_text)
+    payload = match.group(1) if match else response_text
+
+    try:
+        questions_data = json_loads(payload)
+    except json.JSONDecodeError as e:
+        raise ValueError(
+            f"Failed to parse questions from Claude response: {str(e)}"
+        ) from e
+
+    if not isinstance(questions_data, dict):
+        raise ValueError("Claude response is not a JSON object with questions")
+    questions = questions_data.get("questions", [])
+    if not isinstance(questions, list):
+        raise ValueError("Questions in Claude response are not a list")
+    return questions
+
+
+async def analyze_focus_area(
+    specification: str, focus_area: str, semaphore: asyncio.Semaphore
+) -> list[dict]:
+    """Generate clarifying questions for a single focus area using Claude.
+
+    Args:
+        specification: The product specification to analyze
+        focus_area: The focus area to generate questions for
+        semaphore: Semaphore limiting concurrent Claude requests
+
+    Returns:
+        Questions for the focus area
+    """
+    client = get_async_client()
+
+    prompt = _analysis_prompt(specification, focus_area)
+
+    async with semaphore:
+        response = await client.messages.create(
+            model="claude-sonnet-4-20250514",
+            max_tokens=1024,
+            system=CLARIFY_SYSTEM_BLOCKS,
+            messages=[{"role": "user", "content": prompt}],
+        )
+
+    questions = parse_questions(collect_text(response))
+    return [{**question, "category": focus_area} for question in questions]
+
+
+async def analyze_and_generate_questions(state: ClarifyState) -> dict:
     """Analyze specification and generate clarifying questions using Claude.
 
+    Each focus area is analyzed by its own request. The first one runs on its
+    own and writes the specification to the prompt cache, then the remaining
+    focus areas are analyzed concurrently and read it from there. The
+    questions are ranked by impact and the top MAX_QUESTIONS are kept. Focus
+    areas whose response can't be parsed are logged and skipped.
+
+    The node only runs without answers, so results are cached per
+    specification. Failures raise instead of setting "error" so that they are
+    never cached.
+
     Args:
         state: Current workflow state
 
     Returns:
         Updated state with generated questions
+
+    Raises:
+        ValueError: If the questions can't be parsed for any focus area
     """
     # Skip if there's an error
     if state.get("error"):
         return {}
 
-    client = Anthropic()
+    semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
 
-    prompt = get_analysis_prompt(state["specification"])
+    # The first request writes the prompt cache entry the others then read
+    first_area, *other_areas = FOCUS_AREAS
+    results = await asyncio.gather(
+        analyze_focus_area(state["specification"], first_area, semaphore),
+        return_exceptions=True,
+    )
+    results += await asyncio.gather(
+        *(
+            analyze_focus_area(state["specification"], focus_area, semaphore)
+            for focus_area in other_areas
+        ),
+        return_exceptions=True,
+    )
 
-    response = client.messages.create(
-        model="claude-sonnet-4-20250514",
-        max_tokens=4096,
-        system=CLARIFY_SYSTEM_PROMPT,
-        messages=[{"role": "user", "content": prompt}],
+    # A focus area whose response can't be parsed is skipped, so it doesn't
+    # throw away the questions of the others
+    area_questions = []
+    for focus_area, result in zip(FOCUS_AREAS, results):
+        if isinstance(result, ValueError):
+            logger.warning("Skipping focus area %r: %s", focus_area, result)
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            area_questions.append(result)
+
+    if not area_questions:
+        raise ValueError(
+            "Failed to parse questions from Claude response for every focus area"
+        )
+
+    # Stable sort, so equally rated questions keep their focus area order
+    candidates = sorted(
+        (question for questions in area_questions for question in questions),
+        key=lambda question: IMPACT_RANK.get(
+            str(question.get("impact", "")).lower(), len(IMPACT_RANK)
+        ),
     )
 
-    # Parse the JSON response containing questions
-    try:
-        response_text = response.content[0].text
-        # Extract JSON from markdown code blocks if present
-        if "```json" in response_text:
-            json_start = response_text.find("```json") + 7
-            json_end = response_text.find("```", json_start)
-            response_text = response_text[json_start:json_end].strip()
-        elif "```" in response_text:
-            json_start = response_text.find("```") + 3
-            json_end = response_text.find("```", json_start)
-            response_text = response_text[json_start:json_end].strip()
-
-        questions_data = json.loads(response_text)
-        questions = questions_data.get("questions", [])
-    except (json.JSONDecodeError, KeyError) as e:
-        return {"error": f"Failed to parse questions from Claude response: {str(e)}"}
+    questions = [
+        {**question, "id": question_id}
+        for question_id, question in enumerate(candidates[:MAX_QUESTIONS], start=1)
+    ]
 
     return {"questions": questions}
 
 
-def update_specification(state: ClarifyState) -> dict:
-    """Update specification with clarifications using Claude.
+def build_qa_pairs(questions: list[dict], answers: dict[int, str]) -> list[dict]:
+    """Pair each answered question with its answer.
+
+    Args:
+        questions: Generated clarifying questions
+        answers: Answers keyed by question ID
+
+    Returns:
+        List of dicts with the question ID, question and answer
+    """
+    return [
+        {
+            "id": question["id"],
+            "question": question["question"],
+            "answer": answers[question["id"]],
+        }
+        for question in questions
+        if question["id"] in answers
+    ]
+
+
+async def update_and_save_specification(
+    state: ClarifyState, config: RunnableConfig
+) -> dict:
+    """Update specification with clarifications using Claude and save it.
+
+    The response is streamed, so the optional on_text callback sees the
+    updated specification as it is written. It is only saved once complete,
+    since code fences around it have to be stripped first.
 
     Args:
         state: Current workflow state
+        config: Runnable config carrying the optional on_text callback
 
     Returns:
-        Updated state with modified specification
+        Empty dict, or an error if no answers match the questions
     """
     # Skip if there's an error or no answers
     if state.get("error") or not state.get("answers"):
         return {}
 
-    # Build Q&A pairs from questions and answers
-    qa_pairs = []
-    for question in state["questions"]:
-        question_id = question["id"]
-        if question_id in state["answers"]:
-            qa_pairs.append(
-                {
-                    "id": question_id,
-                    "question": question["question"],
-                    "answer": state["answers"][question_id],
-                }
-            )
+    qa_pairs = build_qa_pairs(state["questions"], state["answers"])
 
     if not qa_pairs:
         return {"error": "No answers provided to update specification"}
 
-    client = Anthropic()
+    client = get_async_client()
 
     prompt = get_update_prompt(state["specification"], qa_pairs)
 
-    response = client.messages.create(
+    on_text = get_text_callback(config)
+    chunks = []
+
+    async with client.messages.stream(
         model="claude-sonnet-4-20250514",
         max_tokens=8192,
-        system=UPDATE_SYSTEM_PROMPT,
+        system=UPDATE_SYSTEM_BLOCKS,
         messages=[{"role": "user", "content": prompt}],
-    )
+    ) as stream:
+        async for chunk in stream.text_stream:
+            if on_text:
+                on_text(chunk)
+            chunks.append(chunk)
 
-    updated_spec = response.content[0].text
+    updated_spec = "".join(chunks)
 
     # Remove markdown code fences if present
-    if updated_spec.startswith("```markdown"):
-        updated_spec = updated_spec[11:]  # Remove ```markdown
-        if updated_spec.endswith("```"):
-            updated_spec = updated_spec[:-3]  # Remove trailing ```
-    elif updated_spec.startswith("```"):
-        updated_spec = updated_spec[3:]  # Remove ```
-        if updated_spec.endswith("```"):
-            updated_spec = updated_spec[:-3]  # Remove trailing ```
+    match = _MD_FENCE_RE.match(updated_spec)
+    updated_spec = (match.group(1) if match else updated_spec).strip()
 
-    updated_spec = updated_spec.strip()
+    # Overwrite the specification in place
+    save_markdown(updated_spec, state["spec_path"] / "specification.md")
 
-    return {"updated_spec": updated_spec}
+    return {}
 
 
-def save_specification(state: ClarifyState) -> dict:
-    """Save the updated specification to file.
+async def analyze_and_update(state: ClarifyState) -> dict:
+    """Generate questions and apply already known answers in one Claude call.
+
+    Used when answers are supplied without the questions they answer (e.g.
+    scripted runs), so the questions don't need a round trip of their own.
+    Claude answers through the emit_clarifications tool, which returns both
+    the questions and the updated specification.
 
     Args:
         state: Current workflow state
 
     Returns:
-        Empty dict (no state updates needed)
+        Updated state with the generated questions
     """
-    # Skip if there's an error
-    if state.get("error"):
-        return {}
+    client = get_async_client()
+
+    prompt = get_analyze_and_update_prompt(state["specification"], state["answers"])
+
+    response = await client.messages.create(
+        **tool_request(
+            {
+                "model": "claude-sonnet-4-20250514",
+                "max_tokens": 8192,
+                "system": CLARIFY_SYSTEM_BLOCKS + UPDATE_SYSTEM_BLOCKS,
+                "messages": [{"role": "user", "content": prompt}],
+            },
+            EMIT_CLARIFICATIONS_TOOL,
+        )
+    )
+    result = get_tool_input(response, EMIT_CLARIFICATIONS_TOOL["name"])
 
-    # Save updated specification
-    spec_file = state["spec_path"] / "specification.md"
-    save_markdown(state["updated_spec"], spec_file)
+    if not build_qa_pairs(result["questions"], state["answers"]):
+        return {"error": "No answers provided to update specification"}
 
-    return {}
+    # Overwrite the specification in place
+    save_markdown(
+        result["updated_spec"].strip(), state["spec_path"] / "specification.md"
+    )
+
+    return {"questions": result["questions"]}
 
 
 def should_continue_after_load(state: ClarifyState) -> str:
@@ -195,47 +355,22 @@ def should_continue_after_load(state: ClarifyState) -> str:
     """
     if state.get("error"):
         return END
-    return "analyze"
-
-
-def should_continue_after_analyze(state: ClarifyState) -> str:
-    """Determine if workflow should continue after analyzing.
-
-    Args:
-        state: Current workflow state
-
-    Returns:
-        Next node name or END
-    """
-    if state.get("error"):
-        return END
-    # If no questions generated, end workflow
-    if not state.get("questions"):
-        return END
-    # If we have answers, proceed to update
-    if state.get("answers"):
+    # Answers to known questions can be applied right away
+    if state.get("answers") and state.get("questions"):
         return "update"
-    # Otherwise end (CLI will handle question/answer loop)
-    return END
-
-
-def should_continue_after_update(state: ClarifyState) -> str:
-    """Determine if workflow should continue after updating.
-
-    Args:
-        state: Current workflow state
-
-    Returns:
-        Next node name or END
-    """
-    if state.get("error"):
-        return END
-    return "save"
+    # Answers without their questions: generate both in a single call
+    if state.get("answers"):
+        return "analyze_and_update"
+    return "analyze"
 
 
+@lru_cache(maxsize=1)
 def build_clarify_workflow() -> StateGraph:
     """Build the clarify workflow graph.
 
+    The graph is compiled on first use rather than at import time, since its
+    node cache lives in the specs directory of the current project.
+
     Returns:
         Compiled LangGraph workflow
     """
@@ -243,48 +378,87 @@ def build_clarify_workflow() -> StateGraph:
 
     # Add nodes
     workflow.add_node("load", load_specification)
-    workflow.add_node("analyze", analyze_and_generate_questions)
-    workflow.add_node("update", update_specification)
-    workflow.add_node("save", save_specification)
+    workflow.add_node(
+        "analyze",
+        analyze_and_generate_questions,
+        cache_policy=cache_policy("specification"),
+    )
+    workflow.add_node("update", update_and_save_specification)
+    workflow.add_node("analyze_and_update", analyze_and_update)
 
     # Add edges
     workflow.add_edge(START, "load")
     workflow.add_conditional_edges(
-        "load", should_continue_after_load, {"analyze": "analyze", END: END}
+        "load",
+        should_continue_after_load,
+        {
+            "analyze": "analyze",
+            "update": "update",
+            "analyze_and_update": "analyze_and_update",
+            END: END,
+        },
     )
-    workflow.add_conditional_edges(
-        "analyze",
-        should_continue_after_analyze,
-        {"update": "update", END: END},
-    )
-    workflow.add_conditional_edges(
-        "update", should_continue_after_update, {"save": "save", END: END}
-    )
-    workflow.add_edge("save", END)
+    workflow.add_edge("analyze", END)
+    workflow.add_edge("update", END)
+    workflow.add_edge("analyze_and_update", END)
 
-    return workflow.compile()
+    return workflow.compile(cache=get_node_cache())
 
 
-def run_clarify(answers: dict[int, str] | None = None) -> ClarifyState:
-    """Run the clarify workflow.
+async def run_clarify_async(
+    answers: dict[int, str] | None = None,
+    on_text: Callable[[str], None] | None = None,
+    questions: list[dict] | None = None,
+) -> ClarifyState:
+    """Run the clarify workflow on the current event loop.
 
     Args:
         answers: Optional dict mapping question IDs to user answers.
                 If not provided, workflow will only generate questions.
+        on_text: Optional callback receiving the updated specification
+                as it streams
+        questions: Optional questions from an earlier run that the answers
+                  refer to. If not provided along with answers, questions
+                  are generated and answered in a single Claude call.
 
     Returns:
         Final workflow state
     """
-    workflow = build_clarify_workflow()
-
     initial_state: ClarifyState = {
         "spec_path": None,
         "specification": "",
-        "questions": None,
+        "questions": questions,
         "answers": answers,
-        "updated_spec": "",
         "error": None,
     }
 
-    result = workflow.invoke(initial_state)
+    workflow = build_clarify_workflow()
+
+    async with async_client_session():
+        result = await workflow.ainvoke(
+            initial_state, {"configurable": {"on_text": on_text}}
+        )
     return result
+
+
+def run_clarify(
+    answers: dict[int, str] | None = None,
+    on_text: Callable[[str], None] | None = None,
+    questions: list[dict] | None = None,
+) -> ClarifyState:
+    """Run the clarify workflow.
+
+    Synchronous wrapper around run_clarify_async().
+
+    Args:
+        answers: Optional dict mapping question IDs to user answers.
+                If not provided, workflow will only generate questions.
+        on_text: Optional callback receiving the updated specification
+                as it streams
+        questions: Optional questions from an earlier run that the answers
+                  refer to
+
+    Returns:
+        Final workflow state
+    """
+    return asyncio.run(run_clarify_async(answers, on_text, questions))
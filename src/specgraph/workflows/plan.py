@@ -1,13 +1,38 @@
 """Plan workflow - Generate technical plans using LangGraph."""
 
+import asyncio
+from collections.abc import Callable
+from functools import lru_cache
 from pathlib import Path
 from typing import TypedDict
 
-from anthropic import Anthropic
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import END, START, StateGraph
 
-from specgraph.prompts.plan_prompts import PLAN_SYSTEM_PROMPT, get_plan_prompt
-from specgraph.utils.file_manager import find_latest_spec, save_markdown
+from specgraph.prompts.plan_prompts import (
+    EMIT_PLAN_TOOL,
+    PLAN_SYSTEM_BLOCKS,
+    get_plan_prompt,
+    render_plan_markdown,
+)
+from specgraph.utils.file_manager import (
+    load_latest_spec,
+    save_json,
+    save_markdown,
+    save_markdown_stream,
+)
+from specgraph.utils.llm import (
+    async_client_session,
+    echo_text,
+    get_async_client,
+    get_text_callback,
+    get_tool_input,
+    tool_request,
+)
+
+# Prompt blocks are only read by the SDK, so repeated runs with the same
+# specification and constraints can share them
+_plan_prompt = lru_cache(maxsize=32)(get_plan_prompt)
 
 
 class PlanState(TypedDict):
@@ -16,8 +41,10 @@ class PlanState(TypedDict):
     technical_constraints: str
     spec_path: Path | None
     specification: str
+    structured: bool
     plan: str
     plan_file: Path | None
+    plan_json_file: Path | None
     error: str | None
 
 
@@ -30,22 +57,10 @@ def load_specification(state: PlanState) -> dict:
     Returns:
         Updated state with loaded specification
     """
-    # Find the latest spec directory
-    spec_path = find_latest_spec()
-
-    if not spec_path:
-        return {"error": "No specifications found. Run 'acpctl specify' first."}
-
-    spec_file = spec_path / "specification.md"
-
-    if not spec_file.exists():
-        return {
-            "error": f"Specification file not found at {spec_file}. "
-            "Run 'acpctl specify' first."
-        }
-
     try:
-        specification = spec_file.read_text(encoding="utf-8")
+        spec_path, specification = load_latest_spec()
+    except FileNotFoundError as e:
+        return {"error": str(e)}
     except Exception as e:
         return {"error": f"Failed to read specification: {str(e)}"}
 
@@ -56,55 +71,112 @@ def load_specification(state: PlanState) -> dict:
     }
 
 
-def generate_plan(state: PlanState) -> dict:
+def build_plan_request(
+    specification: str, technical_constraints: str = "", structured: bool = False
+) -> dict:
+    """Build the Claude request parameters for plan generation.
+
+    Args:
+        specification: The product specification
+        technical_constraints: Technical preferences or constraints
+        structured: Build the request for an emit_plan tool answer, whose
+                   JSON needs more tokens than markdown
+
+    Returns:
+        Keyword arguments for messages.create
+    """
+    return {
+        "model": "claude-sonnet-4-20250514",
+        "max_tokens": 8192 if structured else 4096,
+        "system": PLAN_SYSTEM_BLOCKS,
+        "messages": [
+            {
+                "role": "user",
+                "content": _plan_prompt(specification, technical_constraints),
+            }
+        ],
+    }
+
+
+async def generate_plan(state: PlanState, config: RunnableConfig) -> dict:
     """Generate technical plan using Claude.
 
+    The response is streamed into plan.md in the spec directory as it
+    arrives. The plan text is returned as well, so a tasks run chained after
+    this one doesn't have to read it back from disk.
+
     Args:
         state: Current workflow state
+        config: Runnable config carrying the optional on_text callback
 
     Returns:
-        Updated state with generated plan
+        Updated state with plan text and file path
     """
     # Skip if there's an error
     if state.get("error"):
         return {}
 
-    client = Anthropic()
+    client = get_async_client()
 
-    user_prompt = get_plan_prompt(
-        state["specification"], state.get("technical_constraints", "")
-    )
+    on_text = get_text_callback(config)
+    plan_chunks: list[str] = []
 
-    response = client.messages.create(
-        model="claude-sonnet-4-20250514",
-        max_tokens=4096,
-        system=PLAN_SYSTEM_PROMPT,
-        messages=[{"role": "user", "content": user_prompt}],
-    )
+    def collect_chunk(chunk: str) -> None:
+        plan_chunks.append(chunk)
+        if on_text:
+            on_text(chunk)
+
+    # Save plan in the spec directory
+    plan_file = state["spec_path"] / "plan.md"
+
+    async with client.messages.stream(
+        **build_plan_request(
+            state["specification"], state.get("technical_constraints", "")
+        )
+    ) as stream:
+        await save_markdown_stream(
+            echo_text(stream.text_stream, collect_chunk), plan_file
+        )
 
-    plan = response.content[0].text
+    return {"plan": "".join(plan_chunks), "plan_file": plan_file}
 
-    return {"plan": plan}
 
+async def generate_structured_plan(state: PlanState) -> dict:
+    """Generate technical plan as JSON using Claude tool use.
 
-def save_plan(state: PlanState) -> dict:
-    """Save the plan to a file.
+    Claude answers through the emit_plan tool, so the SDK returns the
+    technical plan already parsed. It is saved as plan.json for downstream
+    tooling and rendered to plan.md.
 
     Args:
         state: Current workflow state
 
     Returns:
-        Updated state with plan file path
+        Updated state with plan text and file paths
     """
-    # Skip if there's an error
-    if state.get("error"):
-        return {}
+    client = get_async_client()
+
+    response = await client.messages.create(
+        **tool_request(
+            build_plan_request(
+                state["specification"],
+                state.get("technical_constraints", ""),
+                structured=True,
+            ),
+            EMIT_PLAN_TOOL,
+        )
+    )
+    plan_data = get_tool_input(response, EMIT_PLAN_TOOL["name"])
 
-    # Save plan in the spec directory
+    # Save both files in the spec directory
     plan_file = state["spec_path"] / "plan.md"
-    save_markdown(state["plan"], plan_file)
+    plan_json_file = state["spec_path"] / "plan.json"
+
+    plan = render_plan_markdown(plan_data)
+    save_json(plan_data, plan_json_file)
+    save_markdown(plan, plan_file)
 
-    return {"plan_file": plan_file}
+    return {"plan": plan, "plan_file": plan_file, "plan_json_file": plan_json_file}
 
 
 def should_continue(state: PlanState) -> str:
@@ -118,9 +190,12 @@ def should_continue(state: PlanState) -> str:
     """
     if state.get("error"):
         return END
+    if state.get("structured"):
+        return "generate_structured"
     return "generate"
 
 
+@lru_cache(maxsize=1)
 def build_plan_workflow() -> StateGraph:
     """Build the plan workflow graph.
 
@@ -132,38 +207,79 @@ def build_plan_workflow() -> StateGraph:
     # Add nodes
     workflow.add_node("load", load_specification)
     workflow.add_node("generate", generate_plan)
-    workflow.add_node("save", save_plan)
+    workflow.add_node("generate_structured", generate_structured_plan)
 
     # Add edges
     workflow.add_edge(START, "load")
     workflow.add_conditional_edges(
-        "load", should_continue, {"generate": "generate", END: END}
+        "load",
+        should_continue,
+        {
+            "generate": "generate",
+            "generate_structured": "generate_structured",
+            END: END,
+        },
     )
-    workflow.add_edge("generate", "save")
-    workflow.add_edge("save", END)
+    workflow.add_edge("generate", END)
+    workflow.add_edge("generate_structured", END)
 
     return workflow.compile()
 
 
-def run_plan(technical_constraints: str = "") -> PlanState:
-    """Run the plan workflow.
+async def run_plan_async(
+    technical_constraints: str = "",
+    on_text: Callable[[str], None] | None = None,
+    structured: bool = False,
+) -> PlanState:
+    """Run the plan workflow on the current event loop.
 
     Args:
         technical_constraints: Technical preferences or constraints
+        on_text: Optional callback receiving plan text as it streams
+        structured: Generate the plan as JSON (saved as plan.json and
+                   rendered to plan.md) instead of streaming markdown
 
     Returns:
-        Final workflow state
+        Final workflow state, including the spec directory, specification and
+        plan that run_tasks() accepts to skip reading them back
     """
-    workflow = build_plan_workflow()
-
     initial_state: PlanState = {
         "technical_constraints": technical_constraints,
         "spec_path": None,
         "specification": "",
+        "structured": structured,
         "plan": "",
         "plan_file": None,
+        "plan_json_file": None,
         "error": None,
     }
 
-    result = workflow.invoke(initial_state)
+    workflow = build_plan_workflow()
+
+    async with async_client_session():
+        result = await workflow.ainvoke(
+            initial_state, {"configurable": {"on_text": on_text}}
+        )
     return result
+
+
+def run_plan(
+    technical_constraints: str = "",
+    on_text: Callable[[str], None] | None = None,
+    structured: bool = False,
+) -> PlanState:
+    """Run the plan workflow.
+
+    Synchronous wrapper around run_plan_async().
+
+    Args:
+        technical_constraints: Technical preferences or constraints
+        on_text: Optional callback receiving plan text as it streams
+        structured: Generate the plan as JSON (saved as plan.json and
+                   rendered to plan.md) instead of streaming markdown
+
+    Returns:
+        Final workflow state, including the spec directory, specification and
+        plan that run_tasks() accepts to skip reading them back
+    """
+    return asyncio.run(run_plan_async(technical_constraints, on_text, structured))
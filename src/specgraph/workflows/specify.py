@@ -1,23 +1,35 @@
 """Specify workflow - Generate product specifications using LangGraph."""
 
+import asyncio
+import shutil
+from collections.abc import Callable
+from functools import lru_cache
 from pathlib import Path
 from typing import TypedDict
 
-from anthropic import Anthropic
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import END, START, StateGraph
 
 from specgraph.prompts.specify_prompts import (
-    SPECIFY_SYSTEM_PROMPT,
+    SPECIFY_SYSTEM_BLOCKS,
     get_specify_prompt,
 )
-from specgraph.utils.file_manager import create_spec_directory, save_markdown
+from specgraph.utils.file_manager import create_spec_directory, save_markdown_stream
+from specgraph.utils.llm import (
+    async_client_session,
+    echo_text,
+    get_async_client,
+    get_text_callback,
+)
+
+# Batch reruns for the same description build the prompt only once
+_specify_prompt = lru_cache(maxsize=32)(get_specify_prompt)
 
 
 class SpecifyState(TypedDict):
     """State for the specify workflow."""
 
     feature_description: str
-    specification: str
     spec_path: Path
     spec_number: int
     error: str | None
@@ -26,11 +38,14 @@ class SpecifyState(TypedDict):
 def analyze_input(state: SpecifyState) -> dict:
     """Analyze and validate the feature description.
 
+    The description is stripped once here and stored back in the state, so
+    later nodes use it as is.
+
     Args:
         state: Current workflow state
 
     Returns:
-        Updated state with any validation errors
+        Updated state with the stripped description or a validation error
     """
     feature_desc = state.get("feature_description", "").strip()
 
@@ -40,43 +55,35 @@ def analyze_input(state: SpecifyState) -> dict:
     if len(feature_desc) < 10:
         return {"error": "Feature description is too short (minimum 10 characters)"}
 
-    return {"error": None}
+    return {"feature_description": feature_desc, "error": None}
 
 
-def generate_specification(state: SpecifyState) -> dict:
-    """Generate product specification using Claude.
+def build_specification_request(feature_description: str) -> dict:
+    """Build the Claude request parameters for specification generation.
 
     Args:
-        state: Current workflow state
+        feature_description: Description of the feature to specify
 
     Returns:
-        Updated state with generated specification
+        Keyword arguments for messages.create
     """
-    # Skip if there's an error
-    if state.get("error"):
-        return {}
-
-    client = Anthropic()
-
-    user_prompt = get_specify_prompt(state["feature_description"])
-
-    response = client.messages.create(
-        model="claude-sonnet-4-20250514",
-        max_tokens=4096,
-        system=SPECIFY_SYSTEM_PROMPT,
-        messages=[{"role": "user", "content": user_prompt}],
-    )
-
-    specification = response.content[0].text
+    return {
+        "model": "claude-sonnet-4-20250514",
+        "max_tokens": 4096,
+        "system": SPECIFY_SYSTEM_BLOCKS,
+        "messages": [{"role": "user", "content": _specify_prompt(feature_description)}],
+    }
 
-    return {"specification": specification}
 
+async def generate_specification(state: SpecifyState, config: RunnableConfig) -> dict:
+    """Generate product specification using Claude.
 
-def save_specification(state: SpecifyState) -> dict:
-    """Save the specification to a file.
+    The response is streamed straight into specification.md in a new spec
+    directory, so it never has to be held in memory as a whole.
 
     Args:
         state: Current workflow state
+        config: Runnable config carrying the optional on_text callback
 
     Returns:
         Updated state with spec path information
@@ -85,12 +92,23 @@ def save_specification(state: SpecifyState) -> dict:
     if state.get("error"):
         return {}
 
+    client = get_async_client()
+
     # Create spec directory
     spec_path, spec_number = create_spec_directory(state["feature_description"])
 
-    # Save specification
-    spec_file = spec_path / "specification.md"
-    save_markdown(state["specification"], spec_file)
+    try:
+        async with client.messages.stream(
+            **build_specification_request(state["feature_description"])
+        ) as stream:
+            await save_markdown_stream(
+                echo_text(stream.text_stream, get_text_callback(config)),
+                spec_path / "specification.md",
+            )
+    except Exception:
+        # Don't leave a spec directory without a specification behind
+        shutil.rmtree(spec_path, ignore_errors=True)
+        raise
 
     return {"spec_path": spec_path, "spec_number": spec_number}
 
@@ -109,9 +127,12 @@ def should_continue(state: SpecifyState) -> str:
     return "generate"
 
 
+@lru_cache(maxsize=1)
 def build_specify_workflow() -> StateGraph:
     """Build the specify workflow graph.
 
+    The graph never changes, so it is compiled once and reused by every run.
+
     Returns:
         Compiled LangGraph workflow
     """
@@ -120,37 +141,57 @@ def build_specify_workflow() -> StateGraph:
     # Add nodes
     workflow.add_node("analyze", analyze_input)
     workflow.add_node("generate", generate_specification)
-    workflow.add_node("save", save_specification)
 
     # Add edges
     workflow.add_edge(START, "analyze")
     workflow.add_conditional_edges(
         "analyze", should_continue, {"generate": "generate", END: END}
     )
-    workflow.add_edge("generate", "save")
-    workflow.add_edge("save", END)
+    workflow.add_edge("generate", END)
 
     return workflow.compile()
 
 
-def run_specify(feature_description: str) -> SpecifyState:
-    """Run the specify workflow.
+async def run_specify_async(
+    feature_description: str, on_text: Callable[[str], None] | None = None
+) -> SpecifyState:
+    """Run the specify workflow on the current event loop.
 
     Args:
         feature_description: Description of the feature to specify
+        on_text: Optional callback receiving specification text as it streams
 
     Returns:
         Final workflow state
     """
-    workflow = build_specify_workflow()
-
     initial_state: SpecifyState = {
         "feature_description": feature_description,
-        "specification": "",
         "spec_path": Path(),
         "spec_number": 0,
         "error": None,
     }
 
-    result = workflow.invoke(initial_state)
+    workflow = build_specify_workflow()
+
+    async with async_client_session():
+        result = await workflow.ainvoke(
+            initial_state, {"configurable": {"on_text": on_text}}
+        )
     return result
+
+
+def run_specify(
+    feature_description: str, on_text: Callable[[str], None] | None = None
+) -> SpecifyState:
+    """Run the specify workflow.
+
+    Synchronous wrapper around run_specify_async().
+
+    Args:
+        feature_description: Description of the feature to specify
+        on_text: Optional callback receiving specification text as it streams
+
+    Returns:
+        Final workflow state
+    """
+    return asyncio.run(run_specify_async(feature_description, on_text))
@@ -1,13 +1,42 @@
 """Tasks workflow - Generate task breakdowns using LangGraph."""
 
+import asyncio
+from collections.abc import Callable
+from functools import lru_cache
 from pathlib import Path
 from typing import TypedDict
 
-from anthropic import Anthropic
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import END, START, StateGraph
 
-from specgraph.prompts.tasks_prompts import TASKS_SYSTEM_PROMPT, get_tasks_prompt
-from specgraph.utils.file_manager import find_latest_spec, save_markdown
+from specgraph.prompts.tasks_prompts import (
+    EMIT_TASKS_TOOL,
+    TASKS_END_MARKER,
+    TASKS_STRUCTURED_SYSTEM_BLOCKS,
+    TASKS_SYSTEM_BLOCKS,
+    get_tasks_prompt,
+    render_tasks_markdown,
+)
+from specgraph.utils.file_manager import (
+    load_latest_spec,
+    read_markdown,
+    save_json,
+    save_markdown,
+    save_markdown_stream,
+)
+from specgraph.utils.llm import (
+    async_client_session,
+    echo_text,
+    get_async_client,
+    get_text_callback,
+    get_tool_input,
+    stop_at,
+    tool_request,
+)
+
+# Memoized, so retries and reruns for the same specification and plan
+# reuse the prompt blocks instead of rebuilding them
+_tasks_prompt = lru_cache(maxsize=32)(get_tasks_prompt)
 
 
 class TasksState(TypedDict):
@@ -16,43 +45,42 @@ class TasksState(TypedDict):
     spec_path: Path | None
     specification: str
     plan: str
-    tasks: str
+    structured: bool
     tasks_file: Path | None
+    tasks_json_file: Path | None
     error: str | None
 
 
 def load_plan(state: TasksState) -> dict:
     """Load the specification and plan from the most recent spec directory.
 
+    Nothing is read if the caller already passed in the spec directory,
+    specification and plan (e.g. right after generating them).
+
     Args:
         state: Current workflow state
 
     Returns:
         Updated state with loaded specification and plan
     """
-    # Find the latest spec directory
-    spec_path = find_latest_spec()
+    if state.get("spec_path") and state.get("specification") and state.get("plan"):
+        return {"error": None}
 
-    if not spec_path:
-        return {"error": "No specifications found. Run 'acpctl specify' first."}
+    try:
+        spec_path, specification = load_latest_spec()
+    except FileNotFoundError as e:
+        return {"error": str(e)}
+    except Exception as e:
+        return {"error": f"Failed to read specification or plan: {str(e)}"}
 
-    spec_file = spec_path / "specification.md"
     plan_file = spec_path / "plan.md"
 
-    if not spec_file.exists():
-        return {
-            "error": f"Specification file not found at {spec_file}. "
-            "Run 'acpctl specify' first."
-        }
-
-    if not plan_file.exists():
+    try:
+        plan = read_markdown(plan_file)
+    except FileNotFoundError:
         return {
-            "error": f"Plan file not found at {plan_file}. " "Run 'acpctl plan' first."
+            "error": f"Plan file not found at {plan_file}. Run 'acpctl plan' first."
         }
-
-    try:
-        specification = spec_file.read_text(encoding="utf-8")
-        plan = plan_file.read_text(encoding="utf-8")
     except Exception as e:
         return {"error": f"Failed to read specification or plan: {str(e)}"}
 
@@ -64,53 +92,98 @@ def load_plan(state: TasksState) -> dict:
     }
 
 
-def generate_tasks(state: TasksState) -> dict:
+def build_tasks_request(
+    specification: str, plan: str, structured: bool = False
+) -> dict:
+    """Build the Claude request parameters for task generation.
+
+    Args:
+        specification: The product specification
+        plan: The technical implementation plan
+        structured: Build the request for an emit_tasks tool answer, whose
+                   JSON needs more tokens than markdown and no end marker
+
+    Returns:
+        Keyword arguments for messages.create
+    """
+    return {
+        "model": "claude-sonnet-4-20250514",
+        "max_tokens": 16384 if structured else 8192,
+        "system": (
+            TASKS_STRUCTURED_SYSTEM_BLOCKS if structured else TASKS_SYSTEM_BLOCKS
+        ),
+        "messages": [{"role": "user", "content": _tasks_prompt(specification, plan)}],
+    }
+
+
+async def generate_tasks(state: TasksState, config: RunnableConfig) -> dict:
     """Generate task breakdown using Claude.
 
+    The response is streamed straight into tasks.md in the spec directory,
+    so it never has to be held in memory as a whole. The stream is closed
+    as soon as the end marker arrives.
+
     Args:
         state: Current workflow state
+        config: Runnable config carrying the optional on_text callback
 
     Returns:
-        Updated state with generated tasks
+        Updated state with tasks file path
     """
     # Skip if there's an error
     if state.get("error"):
         return {}
 
-    client = Anthropic()
+    client = get_async_client()
 
-    user_prompt = get_tasks_prompt(state["specification"], state["plan"])
+    # Save tasks in the spec directory
+    tasks_file = state["spec_path"] / "tasks.md"
 
-    response = client.messages.create(
-        model="claude-sonnet-4-20250514",
-        max_tokens=8192,
-        system=TASKS_SYSTEM_PROMPT,
-        messages=[{"role": "user", "content": user_prompt}],
-    )
+    async with client.messages.stream(
+        **build_tasks_request(state["specification"], state["plan"])
+    ) as stream:
+        await save_markdown_stream(
+            echo_text(
+                stop_at(stream.text_stream, TASKS_END_MARKER),
+                get_text_callback(config),
+            ),
+            tasks_file,
+        )
 
-    tasks = response.content[0].text
+    return {"tasks_file": tasks_file}
 
-    return {"tasks": tasks}
 
+async def generate_structured_tasks(state: TasksState) -> dict:
+    """Generate task breakdown as JSON using Claude tool use.
 
-def save_tasks(state: TasksState) -> dict:
-    """Save the tasks to a file.
+    Claude answers through the emit_tasks tool, so the SDK returns the
+    task breakdown already parsed. It is saved as tasks.json for downstream
+    tooling and rendered to tasks.md.
 
     Args:
         state: Current workflow state
 
     Returns:
-        Updated state with tasks file path
+        Updated state with tasks file paths
     """
-    # Skip if there's an error
-    if state.get("error"):
-        return {}
+    client = get_async_client()
 
-    # Save tasks in the spec directory
+    response = await client.messages.create(
+        **tool_request(
+            build_tasks_request(state["specification"], state["plan"], structured=True),
+            EMIT_TASKS_TOOL,
+        )
+    )
+    tasks_data = get_tool_input(response, EMIT_TASKS_TOOL["name"])
+
+    # Save both files in the spec directory
     tasks_file = state["spec_path"] / "tasks.md"
-    save_markdown(state["tasks"], tasks_file)
+    tasks_json_file = state["spec_path"] / "tasks.json"
 
-    return {"tasks_file": tasks_file}
+    save_json(tasks_data, tasks_json_file)
+    save_markdown(render_tasks_markdown(tasks_data), tasks_file)
+
+    return {"tasks_file": tasks_file, "tasks_json_file": tasks_json_file}
 
 
 def should_continue(state: TasksState) -> str:
@@ -124,9 +197,12 @@ def should_continue(state: TasksState) -> str:
     """
     if state.get("error"):
         return END
+    if state.get("structured"):
+        return "generate_structured"
     return "generate"
 
 
+@lru_cache(maxsize=1)
 def build_tasks_workflow() -> StateGraph:
     """Build the tasks workflow graph.
 
@@ -138,35 +214,90 @@ def build_tasks_workflow() -> StateGraph:
     # Add nodes
     workflow.add_node("load", load_plan)
     workflow.add_node("generate", generate_tasks)
-    workflow.add_node("save", save_tasks)
+    workflow.add_node("generate_structured", generate_structured_tasks)
 
     # Add edges
     workflow.add_edge(START, "load")
     workflow.add_conditional_edges(
-        "load", should_continue, {"generate": "generate", END: END}
+        "load",
+        should_continue,
+        {
+            "generate": "generate",
+            "generate_structured": "generate_structured",
+            END: END,
+        },
     )
-    workflow.add_edge("generate", "save")
-    workflow.add_edge("save", END)
+    workflow.add_edge("generate", END)
+    workflow.add_edge("generate_structured", END)
 
     return workflow.compile()
 
 
-def run_tasks() -> TasksState:
-    """Run the tasks workflow.
+async def run_tasks_async(
+    on_text: Callable[[str], None] | None = None,
+    structured: bool = False,
+    specification: str | None = None,
+    plan: str | None = None,
+    spec_path: Path | None = None,
+) -> TasksState:
+    """Run the tasks workflow on the current event loop.
+
+    Args:
+        on_text: Optional callback receiving task text as it streams
+        structured: Generate the tasks as JSON (saved as tasks.json and
+                   rendered to tasks.md) instead of streaming markdown
+        specification: Optional specification already in memory
+        plan: Optional plan already in memory, e.g. from run_plan()
+        spec_path: Optional spec directory the specification and plan
+                  belong to. Unless all three are given, they are read
+                  from the latest spec directory.
 
     Returns:
         Final workflow state
     """
-    workflow = build_tasks_workflow()
-
     initial_state: TasksState = {
-        "spec_path": None,
-        "specification": "",
-        "plan": "",
-        "tasks": "",
+        "spec_path": spec_path,
+        "specification": specification or "",
+        "plan": plan or "",
+        "structured": structured,
         "tasks_file": None,
+        "tasks_json_file": None,
         "error": None,
     }
 
-    result = workflow.invoke(initial_state)
+    workflow = build_tasks_workflow()
+
+    async with async_client_session():
+        result = await workflow.ainvoke(
+            initial_state, {"configurable": {"on_text": on_text}}
+        )
     return result
+
+
+def run_tasks(
+    on_text: Callable[[str], None] | None = None,
+    structured: bool = False,
+    specification: str | None = None,
+    plan: str | None = None,
+    spec_path: Path | None = None,
+) -> TasksState:
+    """Run the tasks workflow.
+
+    Synchronous wrapper around run_tasks_async().
+
+    Args:
+        on_text: Optional callback receiving task text as it streams
+        structured: Generate the tasks as JSON (saved as tasks.json and
+                   rendered to tasks.md) instead of streaming markdown
+        specification: Optional specification already in memory
+        plan: Optional plan already in memory, e.g. from run_plan()
+        spec_path: Optional spec directory the specification and plan
+                  belong to. Unless all three are given, they are read
+                  from the latest spec directory.
+
+    Returns:
+        Final workflow state
+    """
+    return asyncio.run(
+        run_tasks_async(on_text, structured, specification, plan, spec_path)
+    )
@@ -0,0 +1,25 @@
+"""Tests for the node cache."""
+
+from specgraph.utils.cache import get_node_cache
+from specgraph.workflows.clarify import run_clarify
+
+
+def test_node_cache_opens_database_on_first_use(tmp_path):
+    specs_dir = tmp_path / "specs"
+    cache = get_node_cache(specs_dir)
+
+    assert not specs_dir.exists()
+
+    key = (("analyze",), "key")
+    cache.set({key: ({"questions": []}, None)})
+
+    assert (specs_dir / ".cache.db").exists()
+    assert cache.get([key]) == {key: {"questions": []}}
+
+
+def test_clarify_without_specs_leaves_no_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    monkeypatch.chdir(tmp_path)
+
+    assert run_clarify()["error"]
+    assert not (tmp_path / "specs").exists()
@@ -0,0 +1,86 @@
+"""Tests for the clarify workflow nodes."""
+
+import asyncio
+
+import pytest
+
+from specgraph.workflows import clarify
+
+
+def _patch_focus_areas(monkeypatch, outcomes):
+    async def analyze_focus_area(specification, focus_area, semaphore):
+        outcome = outcomes[focus_area]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return [{**question, "category": focus_area} for question in outcome]
+
+    monkeypatch.setattr(clarify, "analyze_focus_area", analyze_focus_area)
+
+
+def _analyze():
+    return asyncio.run(
+        clarify.analyze_and_generate_questions({"specification": "# Spec"})
+    )
+
+
+def test_unparseable_focus_area_is_skipped(monkeypatch):
+    outcomes = {area: [] for area in clarify.FOCUS_AREAS}
+    outcomes[clarify.FOCUS_AREAS[0]] = ValueError("no JSON")
+    outcomes[clarify.FOCUS_AREAS[1]] = [{"question": "Who?", "impact": "high"}]
+    _patch_focus_areas(monkeypatch, outcomes)
+
+    questions = _analyze()["questions"]
+
+    assert [question["question"] for question in questions] == ["Who?"]
+    assert questions[0]["id"] == 1
+
+
+def test_every_focus_area_failing_raises(monkeypatch):
+    _patch_focus_areas(
+        monkeypatch, {area: ValueError("no JSON") for area in clarify.FOCUS_AREAS}
+    )
+
+    with pytest.raises(ValueError, match="every focus area"):
+        _analyze()
+
+
+def test_request_errors_are_not_skipped(monkeypatch):
+    outcomes = {area: [] for area in clarify.FOCUS_AREAS}
+    outcomes[clarify.FOCUS_AREAS[2]] = RuntimeError("connection reset")
+    _patch_focus_areas(monkeypatch, outcomes)
+
+    with pytest.raises(RuntimeError):
+        _analyze()
+
+
+def test_first_focus_area_finishes_before_others_start(monkeypatch):
+    events = []
+
+    async def analyze_focus_area(specification, focus_area, semaphore):
+        events.append(("start", focus_area))
+        await asyncio.sleep(0)
+        events.append(("end", focus_area))
+        return []
+
+    monkeypatch.setattr(clarify, "analyze_focus_area", analyze_focus_area)
+
+    _analyze()
+
+    first_area = clarify.FOCUS_AREAS[0]
+    assert events[:2] == [("start", first_area), ("end", first_area)]
+    assert len(events) == 2 * len(clarify.FOCUS_AREAS)
+
+
+@pytest.mark.parametrize(
+    "response_text",
+    ["[]", "null", '```json\n[{"question": "Who?"}]\n```', '{"questions": null}'],
+)
+def test_parse_questions_rejects_non_object_json(response_text):
+    with pytest.raises(ValueError):
+        clarify.parse_questions(response_text)
+
+
+def test_parse_questions_reads_fenced_object():
+    response_text = '```json\n{"questions": [{"question": "Who?"}]}\n```'
+
+    assert clarify.parse_questions(response_text) == [{"question": "Who?"}]
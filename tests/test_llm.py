@@ -0,0 +1,51 @@
+"""Tests for the Claude client helpers."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from specgraph.utils.llm import (
+    async_client_session,
+    get_async_client,
+    get_tool_input,
+)
+
+
+def test_async_client_session_shares_and_closes_client(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+
+    async def run():
+        async with async_client_session() as client:
+            async with async_client_session() as nested:
+                assert nested is client
+                assert get_async_client() is client
+            assert not client.is_closed()
+        return client
+
+    assert asyncio.run(run()).is_closed()
+
+
+def test_get_async_client_requires_session():
+    async def run():
+        return get_async_client()
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(run())
+
+
+def _message(stop_reason, content):
+    return SimpleNamespace(stop_reason=stop_reason, content=content)
+
+
+def test_get_tool_input_returns_tool_input():
+    block = SimpleNamespace(type="tool_use", name="emit_plan", input={"title": "T"})
+
+    assert get_tool_input(_message("tool_use", [block]), "emit_plan") == {"title": "T"}
+
+
+def test_get_tool_input_rejects_truncated_response():
+    block = SimpleNamespace(type="tool_use", name="emit_plan", input={})
+
+    with pytest.raises(ValueError, match="max_tokens"):
+        get_tool_input(_message("max_tokens", [block]), "emit_plan")
@@ -0,0 +1,56 @@
+"""Tests for streamed and fenced Claude output handling."""
+
+import asyncio
+
+from specgraph.utils.llm import stop_at
+from specgraph.workflows.clarify import _MD_FENCE_RE
+
+
+async def _chunks(parts):
+    for part in parts:
+        yield part
+
+
+def _stop_at(parts, marker="<!--END-->"):
+    async def collect():
+        return [chunk async for chunk in stop_at(_chunks(parts), marker)]
+
+    return "".join(asyncio.run(collect()))
+
+
+def _unwrap(text):
+    match = _MD_FENCE_RE.match(text)
+    return (match.group(1) if match else text).strip()
+
+
+def test_stop_at_passes_text_without_marker():
+    assert _stop_at(["# Tasks\n", "- [ ] T001 Setup\n"]) == (
+        "# Tasks\n- [ ] T001 Setup\n"
+    )
+
+
+def test_stop_at_drops_marker_and_trailing_text():
+    assert _stop_at(["- [ ] T001\n<!--END-->", "\nDone!"]) == "- [ ] T001\n"
+
+
+def test_stop_at_handles_marker_split_across_chunks():
+    assert _stop_at(["- [ ] T001\n<!--E", "ND", "-->trailing"]) == "- [ ] T001\n"
+
+
+def test_stop_at_releases_held_back_partial_marker():
+    assert _stop_at(["a <!-", "- comment -->"]) == "a <!-- comment -->"
+
+
+def test_unwrap_keeps_nested_bare_code_block():
+    spec = "# Spec\n\nExample:\n```\ncode here\n```\n\n## More sections\n..."
+    assert _unwrap(f"```markdown\n{spec}\n```\n") == spec
+
+
+def test_unwrap_keeps_nested_tagged_code_block():
+    spec = '# Spec\n\n```json\n{"a": 1}\n```\n\n## Data'
+    assert _unwrap(f"```\n{spec}\n```") == spec
+
+
+def test_unwrap_leaves_unfenced_spec_alone():
+    spec = "# Spec\n\n```python\nx = 1\n```\n\nmore"
+    assert _unwrap(spec) == spec